@@ -2,6 +2,15 @@ from iconservice import *
 from .utils.checks import *
 from .utils.type_converter import params_type_converter
 from .utils.SafeMath import SafeMath
+from .utils.chain_config import ChainConfig
+from .utils.merkle import verify_merkle_proof
+from .utils.packed import unpack_fields, split_signatures
+
+MAX_SWAP_BATCH = 30
+MAX_DEPOSIT_ID_QUERY = 1024
+PACKED_SWAP_FIELD_COUNT = 9
+FEE_TYPE = "fee"
+FEE_WITH_DATA_TYPE = "feeWithData"
 
 class TokenInformationInterface(InterfaceScore):
 	@interface
@@ -21,6 +30,10 @@ class TokenSupplyInterface(InterfaceScore):
     def mintTo(self, _account: Address, _amount: int) -> None:
         pass
 
+    @interface
+    def mintBatch(self, _accounts: bytes, _amounts: bytes) -> None:
+        pass
+
 class NFTSupplyInterface(InterfaceScore):
     @interface
     def burn(self, _from: Address, _tokenId: int) -> None:
@@ -39,6 +52,22 @@ class MultiSigWalletInterface(InterfaceScore):
     def getRequirement(self) -> int:
         pass
 
+    @interface
+    def verifySignatures(self, _hash: bytes, _sigs: str) -> bool:
+        pass
+
+    @interface
+    def getOwnerVersion(self) -> int:
+        pass
+
+    @interface
+    def getWalletOwnerCount(self) -> int:
+        pass
+
+    @interface
+    def getWalletOwners(self, _offset: int, _count: int) -> list:
+        pass
+
 class IconMinterContract(IconScoreBase):
     @eventlog
     def Swap(self, hubContract: bytes, fromChain: str, toChain: str, fromAddr: bytes, toAddr: bytes, tokenAddress: bytes, bytes32s: bytes, uints: bytes, data: bytes):
@@ -48,6 +77,14 @@ class IconMinterContract(IconScoreBase):
     def SwapNFT(self, hubContract: bytes, fromChain: str, toChain: str, fromAddr: bytes, toAddr: bytes, tokenAddress: bytes, bytes32s: bytes, uints: bytes, data: bytes):
         pass
 
+    @eventlog
+    def SwapRootSubmitted(self, root: bytes):
+        pass
+
+    @eventlog
+    def FeesSwept(self, receiver: Address, amount: int):
+        pass
+
     @eventlog
     def SwapRequest(self, fromChain: str, toChain: str, fromAddr: bytes, toAddr: bytes, token: bytes, tokenAddress: bytes, decimal: int, amount: int, depositId: int, data: bytes):
         pass
@@ -67,7 +104,13 @@ class IconMinterContract(IconScoreBase):
         self._deposit_count = VarDB("deposit_count", db, value_type=int)
 
         self._is_used_hash = DictDB("is_used_hash", db, value_type=bool)
+        # replay protection by (fromChain, depositId) for chains enabled by governance, 256 ids per word
+        # _processed_deposits's key: fromChain, depositId // 256(int type)
+        self._deposit_id_replay = DictDB("deposit_id_replay", db, value_type=bool)
+        self._processed_deposits = DictDB("processed_deposits", db, value_type=int, depth=2)
         self._is_valid_chain = DictDB("is_valid_chain", db, value_type=bool)
+        # merkle roots of swap hashes signed by the validators, see submitSwapRoot
+        self._verified_roots = DictDB("verified_roots", db, value_type=bool)
         self._is_valid_token = DictDB("is_valid_token", db, value_type=bool)
         self._tokens = DictDB("tokens", db, value_type=bytes)
         self._token_addrs = DictDB("token_addrs", db, value_type=Address)
@@ -75,6 +118,9 @@ class IconMinterContract(IconScoreBase):
 
         self._tax_rate = VarDB("tax_rate", db, value_type=int)
         self._tax_receiver = VarDB("tax_receiver", db, value_type=bytes)
+        # tax accrued per token until it reaches the token's settle threshold or settleTax is called
+        self._accrued_taxes = DictDB("accrued_taxes", db, value_type=int)
+        self._tax_settle_thresholds = DictDB("tax_settle_thresholds", db, value_type=int)
 
         self._policy_admin = VarDB("policy_admin", db, value_type=Address)
         self._chain_fee = DictDB("chain_fee", db, value_type=int)
@@ -82,6 +128,26 @@ class IconMinterContract(IconScoreBase):
         self._chain_uints_length = DictDB("chain_uints_length", db, value_type=int)
         self._chain_address_length = DictDB("chain_address_length", db, value_type=int)
         self._chain_token_length = VarDB("chain_token_length", db, value_type=int)
+        # packed ChainConfig of each chain id, chains without it are read from the DictDBs above
+        self._chain_configs = DictDB("chain_configs", db, value_type=bytes)
+        # decimals of tokens, filled on first use or by governance. 0 means not cached
+        self._token_decimals = DictDB("token_decimals", db, value_type=int)
+
+        # prepaid ICX bridging fees of accounts, spent by swap requests through tokenFallback
+        self._fee_credits = DictDB("fee_credits", db, value_type=int)
+        # bridging fees held by this contract until sweepFees sends them to the fee governance
+        self._accrued_fees = VarDB("accrued_fees", db, value_type=int)
+        # cumulative bridging fee revenue, key: toChain, FEE_TYPE or FEE_WITH_DATA_TYPE
+        self._fee_revenues = DictDB("fee_revenues", db, value_type=int, depth=2)
+
+        # local copy of the governance wallet owners, pushed by MultiSigWallet.setValidators
+        # _validator_version == 0 means not synced, then signatures are checked through the wallet
+        self._validator_version = VarDB("validator_version", db, value_type=int)
+        self._validator_required = VarDB("validator_required", db, value_type=int)
+        self._validators = ArrayDB("validators", db, value_type=Address)
+        self._is_validator = DictDB("is_validator", db, value_type=bool)
+        # upper bound of signatures accepted by _validate_signature, 0 means no bound
+        self._max_signatures = VarDB("max_signatures", db, value_type=int)
 
     def on_install(self, _governance: Address, _fee_governance: Address, _bridging_fee: int, _gov_id: bytes) -> None:
         super().on_install()
@@ -97,20 +163,14 @@ class IconMinterContract(IconScoreBase):
         super().on_update()
 
         self._policy_admin.set(Address.from_string("hx" + "0" * 40))
-        self._chain_fee[self.getChainId("ETH")] = 1000000000000000
-        self._chain_fee_with_data[self.getChainId("ETH")] = 4000000000000000
-        self._chain_uints_length[self.getChainId("ETH")] = 96
-        self._chain_address_length[self.getChainId("ETH")] = 20
-
-        self._chain_fee[self.getChainId("KLAYTN")] = 1000000000000000
-        self._chain_fee_with_data[self.getChainId("KLAYTN")] = 4000000000000000
-        self._chain_uints_length[self.getChainId("KLAYTN")] = 96
-        self._chain_address_length[self.getChainId("KLAYTN")] = 20
-
-        self._chain_fee[self.getChainId("ORBIT")] = 1000000000000000
-        self._chain_fee_with_data[self.getChainId("ORBIT")] = 4000000000000000
-        self._chain_uints_length[self.getChainId("ORBIT")] = 96
-        self._chain_address_length[self.getChainId("ORBIT")] = 20
+        for chainSymbol in ("ETH", "KLAYTN", "ORBIT"):
+            chainId = self.getChainId(chainSymbol)
+            config = self._getChainConfig(chainId)
+            config.fee = 1000000000000000
+            config.fee_with_data = 4000000000000000
+            config.uints_length = 96
+            config.address_length = 20
+            self._chain_configs[chainId] = config.to_bytes()
 
         self._chain_token_length.set(20)
 
@@ -122,9 +182,50 @@ class IconMinterContract(IconScoreBase):
     def isAcitvated(self) -> bool:
         return self._is_activated.get()
 
+    @external(readonly=True)
+    def isUsedHash(self, _hash: bytes) -> bool:
+        return self._is_used_hash[_hash]
+
+    @external(readonly=True)
+    def isDepositIdReplay(self, fromChain: str) -> bool:
+        return self._deposit_id_replay[fromChain]
+
+    @external(readonly=True)
+    def isDepositProcessed(self, fromChain: str, depositId: int) -> bool:
+        """NOTE
+        only covers deposits processed after deposit id replay was enabled for fromChain,
+        older ones are recorded by hash in isUsedHash
+        """
+        return (self._processed_deposits[fromChain][depositId >> 8] >> (depositId & 0xff)) & 1 == 1
+
+    @external(readonly=True)
+    def getUnprocessedDepositIds(self, fromChain: str, _from: int, _to: int) -> list:
+        """NOTE
+        deposit ids in [_from, _to] not marked as processed, see isDepositProcessed
+        """
+        self.require(0 <= _from <= _to, "Error: Invalid range")
+        self.require(_to - _from < MAX_DEPOSIT_ID_QUERY, "Error: Too wide range")
+
+        bitmaps = self._processed_deposits[fromChain]
+        unprocessed = []
+        word_index = -1
+        word = 0
+        for depositId in range(_from, _to + 1):
+            if depositId >> 8 != word_index:
+                word_index = depositId >> 8
+                word = bitmaps[word_index]
+            if (word >> (depositId & 0xff)) & 1 == 0:
+                unprocessed.append(depositId)
+
+        return unprocessed
+
+    @external(readonly=True)
+    def isVerifiedRoot(self, root: bytes) -> bool:
+        return self._verified_roots[root]
+
     @external(readonly=True)
     def isValidChain(self, chain: str) -> bool:
-        return self._is_valid_chain[self.getChainId(chain)]
+        return self._getChainConfig(self.getChainId(chain)).is_valid
 
     @external(readonly=True)
     def isValidToken(self, tokenAddr: Address) -> bool:
@@ -180,9 +281,34 @@ class IconMinterContract(IconScoreBase):
 
     @external(readonly=True)
     def getTokenDecimal(self, tokenAddress: Address) -> int:
+        decimal = self._token_decimals[tokenAddress]
+        if decimal != 0:
+            return decimal
+
         token_score = self.create_interface_score(tokenAddress, TokenInformationInterface)
         return token_score.decimals()
 
+    @external(readonly=True)
+    def accruedTaxOf(self, tokenAddress: Address) -> int:
+        return self._accrued_taxes[tokenAddress]
+
+    @external(readonly=True)
+    def taxSettleThreshold(self, tokenAddress: Address) -> int:
+        return self._tax_settle_thresholds[tokenAddress]
+
+    @external(readonly=True)
+    def accruedFees(self) -> int:
+        return self._accrued_fees.get()
+
+    @external(readonly=True)
+    def getFeeRevenue(self, chain: str) -> dict:
+        revenues = self._fee_revenues[chain]
+        return {FEE_TYPE: revenues[FEE_TYPE], FEE_WITH_DATA_TYPE: revenues[FEE_WITH_DATA_TYPE]}
+
+    @external(readonly=True)
+    def feeCreditOf(self, account: Address) -> int:
+        return self._fee_credits[account]
+
     @external(readonly=True)
     def getTokenBalance(self, tokenAddress: Address, owner: Address) -> int:
         token_score = self.create_interface_score(tokenAddress, TokenInformationInterface)
@@ -205,28 +331,62 @@ class IconMinterContract(IconScoreBase):
 
     @external(readonly=True)
     def chainFee(self, chain: str) -> int:
-        return self._chain_fee[self.getChainId(chain)]
+        return self._getChainConfig(self.getChainId(chain)).fee
 
     @external(readonly=True)
     def chainFeeWithData(self, chain: str) -> int:
-        return self._chain_fee_with_data[self.getChainId(chain)]
+        return self._getChainConfig(self.getChainId(chain)).fee_with_data
 
     @external(readonly=True)
     def chainUintsLength(self, chain: str) -> int:
-        return self._chain_uints_length[self.getChainId(chain)]
+        return self._getChainConfig(self.getChainId(chain)).uints_length
 
     @external(readonly=True)
     def chainAddressLength(self, chain: str) -> int:
-        return self._chain_address_length[self.getChainId(chain)]
+        return self._getChainConfig(self.getChainId(chain)).address_length
 
     @external(readonly=True)
     def chainTokenLength(self) -> int:
         return self._chain_token_length.get()
 
+    @external(readonly=True)
+    def validatorVersion(self) -> int:
+        return self._validator_version.get()
+
+    @external(readonly=True)
+    def validatorRequired(self) -> int:
+        return self._validator_required.get()
+
+    @external(readonly=True)
+    def maxSignatures(self) -> int:
+        return self._max_signatures.get()
+
+    @external(readonly=True)
+    def getValidators(self) -> list:
+        return [str(validator) for validator in self._validators]
+
     @only_governance
     @external
     def transferOwnership(self, _governance: Address):
         self._governance.set(_governance)
+        self._clearValidators()
+        self._validator_version.set(0)
+
+    @only_governance
+    @external
+    def setValidators(self, _version: int, _walletOwners: str, _required: int):
+        self.require(_version > 0 and _version >= self._validator_version.get(), "Error: Invalid validator version")
+        wallet_owner_list = _walletOwners.replace(" ", "").split(",")
+        self._setValidators(_version, [Address.from_string(wallet_owner) for wallet_owner in wallet_owner_list], _required)
+
+    @external
+    def refreshValidators(self):
+        mig_score = self.create_interface_score(self._governance.get(), MultiSigWalletInterface)
+        version = mig_score.getOwnerVersion()
+        self.require(version > 0 and version >= self._validator_version.get(), "Error: Invalid validator version")
+
+        wallet_owner_list = mig_score.getWalletOwners(0, mig_score.getWalletOwnerCount())
+        self._setValidators(version, [Address.from_string(wallet_owner) for wallet_owner in wallet_owner_list], mig_score.getRequirement())
 
     @only_governance
     @external
@@ -239,37 +399,84 @@ class IconMinterContract(IconScoreBase):
         self.require(len(_gov_id) == 32, "Invalid GovId")
         self._gov_id.set(_gov_id)
 
+    @only_governance
+    @external
+    def migrateChainConfigs(self, _chains: str):
+        # _chains: comma separated chain symbols. e.g. "ETH,BSC"
+        # packs the legacy per-field configuration of each chain into its ChainConfig record
+        for chainSymbol in _chains.replace(" ", "").split(","):
+            self.require(len(chainSymbol) != 0 and self._chain.get() != chainSymbol, "Error: invalid chain")
+            self._migrateChainConfig(self.getChainId(chainSymbol))
+
     @only_governance
     @external
     def setValidChain(self, chainSymbol: str, valid: bool, fromAddrLen: int, uintsLen: int):
         self.require(self._chain.get() != chainSymbol, "Error: invalid chain")
-        self._is_valid_chain[self.getChainId(chainSymbol)] = valid
+        chainId = self.getChainId(chainSymbol)
+        config = self._getChainConfig(chainId)
+        config.is_valid = valid
         if valid :
-            self._chain_uints_length[self.getChainId(chainSymbol)] = uintsLen
-            self._chain_address_length[self.getChainId(chainSymbol)] = fromAddrLen
+            config.uints_length = uintsLen
+            config.address_length = fromAddrLen
         else:
-            self._chain_uints_length[self.getChainId(chainSymbol)] = 0
-            self._chain_address_length[self.getChainId(chainSymbol)] = 0
+            config.uints_length = 0
+            config.address_length = 0
+        self._chain_configs[chainId] = config.to_bytes()
 
     @only_governance
     @external
     def setChainLength(self, chainSymbol: str, fromAddrLen: int, uintsLen: int):
         self.require(self._chain.get() != chainSymbol, "Error: invalid chain")
-        self.require(self._is_valid_chain[self.getChainId(chainSymbol)], "Error: invalid chain")
-        self._chain_uints_length[self.getChainId(chainSymbol)] = uintsLen
-        self._chain_address_length[self.getChainId(chainSymbol)] = fromAddrLen
+        chainId = self.getChainId(chainSymbol)
+        config = self._getChainConfig(chainId)
+        self.require(config.is_valid, "Error: invalid chain")
+        config.uints_length = uintsLen
+        config.address_length = fromAddrLen
+        self._chain_configs[chainId] = config.to_bytes()
 
     @only_governance
     @external
     def setTokenLength(self, tokenLen: int):
         self._chain_token_length.set(tokenLen)
 
+    @only_governance
+    @external
+    def enableDepositIdReplay(self, fromChain: str):
+        """NOTE
+        from now on swaps from fromChain are recorded by the depositId in uints[64:96] instead of the hash.
+        it can not be disabled, since the ids recorded in the bitmap are not in the hash set.
+        deposit ids of the source contracts for fromChain must be unique.
+        """
+        self.require(self._chain.get() != fromChain, "Error: invalid chain")
+        self._deposit_id_replay[fromChain] = True
+
+    @only_governance
+    @external
+    def setMaxSignatures(self, _max_signatures: int):
+        self.require(_max_signatures >= 0, "Error: Invalid max signatures")
+        self._max_signatures.set(_max_signatures)
+
+    @only_governance
+    @external
+    def setTokenDecimal(self, tokenAddress: Address, decimal: int):
+        self.require(decimal >= 0, "Error: Invalid decimal")
+        self._token_decimals[tokenAddress] = decimal
+
     @only_governance
     @external
     def setTaxRate(self, _tax_rate: int):
         self.require(_tax_rate < 10000, "Invalid Tax Rate")
         self._tax_rate.set(_tax_rate)
 
+    @only_governance
+    @external
+    def setTaxSettleThreshold(self, tokenAddress: Address, threshold: int):
+        """NOTE
+        tax of tokenAddress is settled once its accrued amount reaches threshold, 0 settles on every swap request
+        """
+        self.require(threshold >= 0, "Error: Invalid threshold")
+        self._tax_settle_thresholds[tokenAddress] = threshold
+
     @only_governance
     @external
     def setTaxReceiver(self, _tax_receiver: bytes):
@@ -294,6 +501,13 @@ class IconMinterContract(IconScoreBase):
         self._token_addrs[token_summary] = tokenAddress
         self._token_summaries[tokenAddress] = token_summary
 
+        # NFTs don't have decimals, their cache is left empty
+        try:
+            token_score = self.create_interface_score(tokenAddress, TokenInformationInterface)
+            self._token_decimals[tokenAddress] = token_score.decimals()
+        except:
+            pass
+
     @external
     def setActivated(self, _is_activated: bool):
         self.require(self.msg.sender == self._policy_admin.get(), "Error: Invalid Sender")
@@ -302,23 +516,32 @@ class IconMinterContract(IconScoreBase):
     @external
     def setChainFee(self, chainSymbol: str, fee: int, feeWithData: int):
         self.require(self.msg.sender == self._policy_admin.get(), "Error: Invalid Sender")
-        self.require(self._is_valid_chain[self.getChainId(chainSymbol)], "Error: Invalid Chain")
-        self._chain_fee[self.getChainId(chainSymbol)] = fee
-        self._chain_fee_with_data[self.getChainId(chainSymbol)] = feeWithData
+        chainId = self.getChainId(chainSymbol)
+        config = self._getChainConfig(chainId)
+        self.require(config.is_valid, "Error: Invalid Chain")
+        config.fee = fee
+        config.fee_with_data = feeWithData
+        self._chain_configs[chainId] = config.to_bytes()
 
     @payable
     @external
     def requestSwap(self, tokenAddress: Address, toChain: str, toAddr: bytes, amount: int, data: bytes = None):
         self.require(self._is_activated.get(), "Error: isActivated False")
-        self.require(self._is_valid_chain[self.getChainId(toChain)], "Error: Invalid toChain")
+        config = self._getChainConfig(self.getChainId(toChain))
+        self.require(config.is_valid, "Error: Invalid toChain")
         self.require(self._is_valid_token[tokenAddress], "Error: Invalid token address")
         self.require(amount > 0, "Error: Not enough amount")
 
-        if data == None:
-            self.require(self.msg.value >= self._chain_fee[self.getChainId(toChain)], "Error: Not enough bridging fee")
-        else:
-            self.require(self.msg.value >= self._chain_fee_with_data[self.getChainId(toChain)], "Error: Not enough bridging fee")
-        self.require(self._transferBridgingFee(self.msg.value), "Error: Transfer Bridging Fee Fail")
+        self.require(self.msg.value >= config.bridging_fee(data), "Error: Not enough bridging fee")
+        self._accrueBridgingFee(toChain, data, self.msg.value)
+
+        self._requestSwap(tokenAddress, toChain, toAddr, amount, data)
+
+    def _requestSwap(self, tokenAddress: Address, toChain: str, toAddr: bytes, amount: int, data: bytes, sender: Address = None):
+        # sender is given when the tokens are already received through tokenFallback
+        received = sender != None
+        if not received:
+            sender = self.msg.sender
 
         tokenSummary = self._token_summaries[tokenAddress]
         self.require(tokenSummary != None, "Error: Invalid token address")
@@ -326,36 +549,103 @@ class IconMinterContract(IconScoreBase):
         token = self._tokens[tokenSummary]
         self.require(token != None, "Error: Invalid token summary")
 
-        decimal = self.getTokenDecimal(tokenAddress)
+        decimal = self._getTokenDecimal(tokenAddress)
         self.require(decimal > 0, "Error: Invalid token decimal")
 
-        userBalance = self.getTokenBalance(tokenAddress, self.msg.sender)
-        self.require(userBalance >= amount, "Error: Not enough balance")
+        if received:
+            self.require(self._burn(tokenAddress, self.address, amount), "Error: Token Burn Fail")
+        else:
+            userBalance = self.getTokenBalance(tokenAddress, sender)
+            self.require(userBalance >= amount, "Error: Not enough balance")
 
-        self.require(self._burn(tokenAddress, self.msg.sender, amount), "Error: Token Burn Fail")
+            self.require(self._burn(tokenAddress, sender, amount), "Error: Token Burn Fail")
 
         if self._tax_rate.get() != 0 and len(self._tax_receiver.get()) != 0 :
-            tax = self._payTax(token, tokenAddress, amount, decimal)
+            tax = self._payTax(sender, token, tokenAddress, amount, decimal)
             amount = SafeMath.sub(amount, tax)
 
         depositId = self._deposit_count.get() + 1
         self._deposit_count.set(depositId)
 
-        self.SwapRequest(self._chain.get(), toChain, self.convertAddressToBytes(self.msg.sender), toAddr, token, self.convertAddressToBytes(tokenAddress), decimal, amount, depositId, data)
+        self.SwapRequest(self._chain.get(), toChain, self.convertAddressToBytes(sender), toAddr, token, self.convertAddressToBytes(tokenAddress), decimal, amount, depositId, data)
+
+    @external
+    def settleTax(self, tokenAddress: Address):
+        self.require(self._is_activated.get(), "Error: isActivated False")
+        self.require(self._accrued_taxes[tokenAddress] > 0, "Error: No accrued tax")
+        self.require(len(self._tax_receiver.get()) != 0, "Error: Invalid taxReceiver")
+
+        token = self._tokens[self._token_summaries[tokenAddress]]
+        self.require(token != None, "Error: Invalid token summary")
+
+        self._settleTax(self.address, token, tokenAddress, self._getTokenDecimal(tokenAddress))
+
+    @external
+    def sweepFees(self):
+        # accrued fees always go to the fee governance, so anyone may trigger the sweep
+        amount = self._accrued_fees.get()
+        self.require(amount > 0, "Error: No accrued fees")
+        self._accrued_fees.set(0)
+        self.require(self._transferBridgingFee(amount), "Error: Transfer Bridging Fee Fail")
+        self.FeesSwept(self._fee_governance.get(), amount)
+
+    @payable
+    @external
+    def depositFeeCredit(self):
+        self.require(self.msg.value > 0, "Error: Not enough amount")
+        self._fee_credits[self.msg.sender] = SafeMath.add(self._fee_credits[self.msg.sender], self.msg.value)
+
+    @external
+    def withdrawFeeCredit(self, amount: int):
+        self.require(amount > 0, "Error: Not enough amount")
+        self._spendFeeCredit(self.msg.sender, amount)
+        self.icx.transfer(self.msg.sender, amount)
+
+    @external
+    def tokenFallback(self, _from: Address, _value: int, _data: bytes):
+        """NOTE
+        swap request in a single transaction, the wrapped token is transferred to this contract with _data
+        {"method": "requestSwap", "params": {"toChain": "ETH", "toAddr": "0x..", "data": "0x.."}}
+        the bridging fee is paid from the fee credit of _from(see depositFeeCredit)
+        """
+        self.require(self._is_activated.get(), "Error: isActivated False")
+        tokenAddress = self.msg.sender
+        self.require(self._is_valid_token[tokenAddress], "Error: Invalid token address")
+        self.require(_value > 0, "Error: Not enough amount")
+
+        try:
+            instruction = json_loads(_data.decode())
+            self.require(instruction["method"] == "requestSwap", "Error: Invalid swap instruction")
+            params = instruction["params"]
+            toChain = params_type_converter("str", params["toChain"])
+            toAddr = params_type_converter("bytes", params["toAddr"])
+            data = params.get("data")
+            if data != None:
+                data = params_type_converter("bytes", data)
+        except:
+            revert("Error: Invalid swap instruction")
+
+        config = self._getChainConfig(self.getChainId(toChain))
+        self.require(config.is_valid, "Error: Invalid toChain")
+
+        fee = config.bridging_fee(data)
+        if fee != 0:
+            self._spendFeeCredit(_from, fee)
+            self._accrueBridgingFee(toChain, data, fee)
+
+        self._requestSwap(tokenAddress, toChain, toAddr, _value, data, _from)
 
     @payable
     @external
     def requestSwapNFT(self, nftAddress: Address, toChain: str, toAddr: bytes, tokenId: int, data: bytes = None):
         self.require(self._is_activated.get(), "Error: isActivated False")
-        self.require(self._is_valid_chain[self.getChainId(toChain)], "Error: Invalid toChain")
+        config = self._getChainConfig(self.getChainId(toChain))
+        self.require(config.is_valid, "Error: Invalid toChain")
         self.require(self._is_valid_token[nftAddress], "Error: Invalid token address")
         self.require(tokenId >= 0, "Error: Invalid Token ID")
 
-        if data == None:
-            self.require(self.msg.value >= self._chain_fee[self.getChainId(toChain)], "Error: Not enough bridging fee")
-        else:
-            self.require(self.msg.value >= self._chain_fee_with_data[self.getChainId(toChain)], "Error: Not enough bridging fee")
-        self.require(self._transferBridgingFee(self.msg.value), "Error: Transfer Bridging Fee Fail")
+        self.require(self.msg.value >= config.bridging_fee(data), "Error: Not enough bridging fee")
+        self._accrueBridgingFee(toChain, data, self.msg.value)
 
         tokenSummary = self._token_summaries[nftAddress]
         self.require(tokenSummary != None, "Error: Invalid token address")
@@ -373,13 +663,110 @@ class IconMinterContract(IconScoreBase):
     @external
     def swap(self, hubContract: bytes, fromChain: str, fromAddr: bytes, toAddr: bytes, token: bytes, bytes32s: bytes, uints: bytes, sigs: str, data: bytes = None):
         self.require(self._is_activated.get(), "Error: isActivated False")
+        self._swap(hubContract, fromChain, fromAddr, toAddr, token, bytes32s, uints, self._splitSignatures(sigs), data)
+
+    @external
+    def swapPacked(self, payload: bytes):
+        """NOTE
+        payload packs the swap params as [length(2)][value] fields in the order of
+        hubContract, fromChain, fromAddr, toAddr, token, bytes32s, uints, data, sigs
+        an empty data field means no data, sigs is the concatenation of 65 bytes signatures
+        """
+        self.require(self._is_activated.get(), "Error: isActivated False")
+        try:
+            fields = unpack_fields(payload, PACKED_SWAP_FIELD_COUNT)
+            sig_list = split_signatures(fields[8])
+            fromChain = str(fields[1], "utf-8")
+        except:
+            revert("Error: Invalid payload")
+
+        data = bytes(fields[7]) if len(fields[7]) > 0 else None
+        self._swap(bytes(fields[0]), fromChain, bytes(fields[2]), bytes(fields[3]), bytes(fields[4]), bytes(fields[5]), bytes(fields[6]), sig_list, data)
+
+    @external
+    def swapBatch(self, swaps: str):
+        """NOTE
+        swaps is a json list of swap params, bytes values are hex strings
+        [{"hubContract": "0x..", "fromChain": "ETH", "fromAddr": "0x..", "toAddr": "0x..", "token": "0x..",
+          "bytes32s": "0x..", "uints": "0x..", "sigs": "0x..,0x..", "data": "0x.."}, ...]
+        every item is verified as in swap, then each token is minted with a single mintBatch call
+        """
+        self.require(self._is_activated.get(), "Error: isActivated False")
+        try:
+            swap_list = json_loads(swaps)
+        except:
+            revert("Error: Invalid swaps")
+        self.require(isinstance(swap_list, list), "Error: Invalid swaps")
+        self.require(0 < len(swap_list) <= MAX_SWAP_BATCH, "Error: Invalid swaps count")
+
+        cache = {"chains": {}, "tokens": {}}
+        mints = {}
+
+        for item in swap_list:
+            try:
+                hubContract = params_type_converter("bytes", item["hubContract"])
+                fromChain = params_type_converter("str", item["fromChain"])
+                fromAddr = params_type_converter("bytes", item["fromAddr"])
+                toAddr = params_type_converter("bytes", item["toAddr"])
+                token = params_type_converter("bytes", item["token"])
+                bytes32s = params_type_converter("bytes", item["bytes32s"])
+                uints = params_type_converter("bytes", item["uints"])
+                sigs = self._splitSignatures(params_type_converter("str", item["sigs"]))
+                data = item.get("data")
+                if data != None:
+                    data = params_type_converter("bytes", data)
+            except:
+                revert("Error: Invalid swaps")
+
+            self._swap(hubContract, fromChain, fromAddr, toAddr, token, bytes32s, uints, sigs, data, cache, mints)
+
+        for tokenAddress, batch in mints.items():
+            self.require(self._mintBatch(tokenAddress, batch[0], batch[1]), "Error: Mint Token Fail")
+
+    @external
+    def submitSwapRoot(self, root: bytes, sigs: str):
+        """NOTE
+        root is the merkle root of swap hashes built as in swap, see utils.merkle
+        validators sign sha_256("ROOT" + chain + minter address + root)
+        """
+        self.require(self._is_activated.get(), "Error: isActivated False")
+        self.require(len(root) == 32, "Error: Invalid root length")
+        self.require(not self._verified_roots[root], "Error: Already verified root")
+
+        rootHash = sha_256("ROOT".encode() + self._chain.get().encode() + self.convertAddressToBytes(self.address) + root)
+        self.require(self._validate_signature(rootHash, self._splitSignatures(sigs)), "Error: Invalid Signature")
+
+        self._verified_roots[root] = True
+        self.SwapRootSubmitted(root)
+
+    @external
+    def swapWithProof(self, hubContract: bytes, fromChain: str, fromAddr: bytes, toAddr: bytes, token: bytes, bytes32s: bytes, uints: bytes, root: bytes, proof: bytes, data: bytes = None):
+        """NOTE
+        proof is the concatenation of the 32 bytes sibling hashes from the swap hash up to the verified root
+        """
+        self.require(self._is_activated.get(), "Error: isActivated False")
+        self._swap(hubContract, fromChain, fromAddr, toAddr, token, bytes32s, uints, None, data, None, None, root, proof)
+
+    def _swap(self, hubContract: bytes, fromChain: str, fromAddr: bytes, toAddr: bytes, token: bytes, bytes32s: bytes, uints: bytes, sigs: list, data: bytes = None, cache: dict = None, mints: dict = None, root: bytes = None, proof: bytes = None):
+        """NOTE
+        when mints is given, the mint is queued there as (accounts, amounts) per token address
+        and the caller is responsible for minting it with mintBatch
+        """
+        if cache is None:
+            cache = {"chains": {}, "tokens": {}}
+
+        config = cache["chains"].get(fromChain)
+        if config is None:
+            config = self._getChainConfig(self.getChainId(fromChain))
+            cache["chains"][fromChain] = config
+
         self.require(len(hubContract) == 20, "Error: Invaild HubContract")
-        self.require(len(fromAddr) == self._chain_address_length[self.getChainId(fromChain)], "Error: Invalid fromAddr length")
+        self.require(len(fromAddr) == config.address_length, "Error: Invalid fromAddr length")
         self.require(len(toAddr) == 21, "Error: Invalid toAddr length")
         self.require(len(token) == self._chain_token_length.get(), "Error: Invalid token length")
         self.require(len(bytes32s) == 64, "Error: Invalid bytes32s length")
         self.require(len(bytes32s) % 32 == 0, "Error: Invalid bytes32s length")
-        self.require(len(uints) == self._chain_uints_length[self.getChainId(fromChain)], "Error: Invalid uints length")
+        self.require(len(uints) == config.uints_length, "Error: Invalid uints length")
         self.require(len(uints) % 32 == 0, "Error: Invalid bytes32s length")
 
         govId = bytes32s[:32]
@@ -388,10 +775,13 @@ class IconMinterContract(IconScoreBase):
         amount = int.from_bytes(uints[:32], "big")
         decimal = int.from_bytes(uints[32:64], "big")
 
-        tokenAddress = self.getTokenAddress(token)
-        self.require(tokenAddress != None, "Error: Invalid Token")
+        tokenAddress = cache["tokens"].get(token)
+        if tokenAddress is None:
+            tokenAddress = self.getTokenAddress(token)
+            self.require(tokenAddress != None, "Error: Invalid Token")
+            cache["tokens"][token] = tokenAddress
 
-        tokenDecimal = self.getTokenDecimal(tokenAddress)
+        tokenDecimal = self._getTokenDecimal(tokenAddress)
         self.require(decimal == tokenDecimal, "Error: Invalid Token Decimal")
 
         hash_bytes = self.encodePackedSwapHash(hubContract, fromChain, self._chain.get(), fromAddr, toAddr, token, bytes32s, uints)
@@ -400,11 +790,23 @@ class IconMinterContract(IconScoreBase):
 
         swapHash = sha_256(hash_bytes)
         self.require(not self._is_used_hash[swapHash], "Error: used swapHash")
-        self._is_used_hash[swapHash] = True
+        self._markProcessed(fromChain, swapHash, uints)
 
-        self.require(self._validate_signature(swapHash, sigs), "Error: Invalid Signature")
+        if root is None:
+            self.require(self._validate_signature(swapHash, sigs), "Error: Invalid Signature")
+        else:
+            self.require(self._verified_roots[root], "Error: Unverified root")
+            self.require(verify_merkle_proof(swapHash, root, proof), "Error: Invalid proof")
 
-        self.require(self._mint(tokenAddress, self.convertBytesToAddress(toAddr), amount), "Error: Mint Token Fail")
+        if mints is None:
+            self.require(self._mint(tokenAddress, self.convertBytesToAddress(toAddr), amount), "Error: Mint Token Fail")
+        else:
+            batch = mints.get(tokenAddress)
+            if batch is None:
+                batch = [b'', b'']
+                mints[tokenAddress] = batch
+            batch[0] += toAddr
+            batch[1] += amount.to_bytes(32, "big")
 
         self.Swap(hubContract, fromChain, self._chain.get(), fromAddr, toAddr, self.convertAddressToBytes(tokenAddress), bytes32s, uints, data)
 
@@ -417,13 +819,14 @@ class IconMinterContract(IconScoreBase):
     @external
     def swapNFT(self, hubContract: bytes, fromChain: str, fromAddr: bytes, toAddr: bytes, token: bytes, bytes32s: bytes, uints: bytes, sigs: str, data: bytes = None):
         self.require(self._is_activated.get(), "Error: isActivated False")
+        config = self._getChainConfig(self.getChainId(fromChain))
         self.require(len(hubContract) == 20, "Error: Invaild HubContract")
-        self.require(len(fromAddr) == self._chain_address_length[self.getChainId(fromChain)], "Error: Invalid fromAddr length")
+        self.require(len(fromAddr) == config.address_length, "Error: Invalid fromAddr length")
         self.require(len(toAddr) == 21, "Error: Invalid toAddr length")
         self.require(len(token) == self._chain_token_length.get(), "Error: Invalid token length")
         self.require(len(bytes32s) == 64, "Error: Invalid bytes32s length")
         self.require(len(bytes32s) % 32 == 0, "Error: Invalid bytes32s length")
-        self.require(len(uints) == self._chain_uints_length[self.getChainId(fromChain)], "Error: Invalid uints length")
+        self.require(len(uints) == config.uints_length, "Error: Invalid uints length")
         self.require(len(uints) % 32 == 0, "Error: Invalid bytes32s length")
 
         govId = bytes32s[:32]
@@ -441,9 +844,9 @@ class IconMinterContract(IconScoreBase):
 
         swapHash = sha_256(hash_bytes)
         self.require(not self._is_used_hash[swapHash], "Error: used swapHash")
-        self._is_used_hash[swapHash] = True
+        self._markProcessed(fromChain, swapHash, uints)
 
-        self.require(self._validate_signature(swapHash, sigs), "Error: Invalid Signature")
+        self.require(self._validate_signature(swapHash, self._splitSignatures(sigs)), "Error: Invalid Signature")
 
         self.require(self._mintNFT(tokenAddress, self.convertBytesToAddress(toAddr), tokenId), "Error: Mint Token Fail")
 
@@ -456,31 +859,116 @@ class IconMinterContract(IconScoreBase):
 
         return nft_bytes + hubContract + fromChain_bytes + toChain_bytes + fromAddr + toAddr + token + bytes32s + uints
 
-    def _validate_signature(self, sigHash: bytes, sigs: str) -> bool:
-        mig_score = self.create_interface_score(self._governance.get(), MultiSigWalletInterface)
-        mig_required = mig_score.getRequirement()
+    def _markProcessed(self, fromChain: str, swapHash: bytes, uints: bytes):
+        if not self._deposit_id_replay[fromChain]:
+            self._is_used_hash[swapHash] = True
+            return
+
+        self.require(len(uints) >= 96, "Error: Invalid uints length")
+        depositId = int.from_bytes(uints[64:96], "big")
+        word_index = depositId >> 8
+        bit = 1 << (depositId & 0xff)
+
+        word = self._processed_deposits[fromChain][word_index]
+        self.require(word & bit == 0, "Error: used depositId")
+        self._processed_deposits[fromChain][word_index] = word | bit
+
+    def _getTokenDecimal(self, tokenAddress: Address) -> int:
+        decimal = self._token_decimals[tokenAddress]
+        if decimal == 0:
+            decimal = self.getTokenDecimal(tokenAddress)
+            self._token_decimals[tokenAddress] = decimal
+        return decimal
+
+    def _migrateChainConfig(self, chainId: bytes):
+        if self._chain_configs[chainId] != None:
+            return
+
+        self._chain_configs[chainId] = self._getChainConfig(chainId).to_bytes()
+        del self._is_valid_chain[chainId]
+        del self._chain_address_length[chainId]
+        del self._chain_uints_length[chainId]
+        del self._chain_fee[chainId]
+        del self._chain_fee_with_data[chainId]
+
+    def _getChainConfig(self, chainId: bytes) -> ChainConfig:
+        packed_config = self._chain_configs[chainId]
+        if packed_config != None:
+            return ChainConfig.from_bytes(packed_config)
+
+        # not migrated yet, read it from the legacy per-field storage
+        return ChainConfig(self._is_valid_chain[chainId], self._chain_address_length[chainId], self._chain_uints_length[chainId], self._chain_fee[chainId], self._chain_fee_with_data[chainId])
+
+    def _setValidators(self, version: int, wallet_owners: list, required: int):
+        self.require(0 < required <= len(wallet_owners), "Error: Invalid validator requirement")
+
+        self._clearValidators()
+        for wallet_owner in wallet_owners:
+            self.require(not self._is_validator[wallet_owner], "Error: Duplicate validator")
+            self._validators.put(wallet_owner)
+            self._is_validator[wallet_owner] = True
+
+        self._validator_required.set(required)
+        self._validator_version.set(version)
+
+    def _clearValidators(self):
+        while len(self._validators) > 0:
+            del self._is_validator[self._validators.pop()]
+
+    def _splitSignatures(self, sigs: str) -> list:
+        return [params_type_converter("bytes", sig) for sig in sigs.replace(" ", "").split(",")]
+
+    def _validate_signature(self, sigHash: bytes, sigs: list) -> bool:
+        max_signatures = self._max_signatures.get()
+        self.require(max_signatures == 0 or len(sigs) <= max_signatures, "Error: Too many signatures")
+
+        # until the local copy of wallet owners is synced, the governance wallet verifies in a single call
+        if self._validator_version.get() == 0:
+            mig_score = self.create_interface_score(self._governance.get(), MultiSigWalletInterface)
+            return mig_score.verifySignatures(sigHash, ",".join(["0x" + sig.hex() for sig in sigs]))
+
+        mig_required = self._validator_required.get()
         self.require(mig_required > 0, "Invalid MultiSigWallet Required")
 
-        sig_list = sigs.replace(" ", "").split(",")
         major_count = 0
+        remaining = len(sigs)
+
+        va_set = set()
 
-        va_list = []
+        for sig in sigs:
+            # stop once the requirement is met, fail once the rest of sigs can not meet it
+            if major_count >= mig_required:
+                break
+            if major_count + remaining < mig_required:
+                return False
+            remaining -= 1
 
-        for sig_bytes in sig_list:
-            sig = params_type_converter("bytes", sig_bytes)
             self.require(len(sig) == 65, "Invalid Sig length")
 
             pub = recover_key(sigHash, sig, False)
             self.require(len(pub) == 65, "Invalid PubKey length")
 
             va = Address.from_bytes(sha3_256(pub[1:])[12:])
-            if mig_score.checkIfWalletOwner(va):
-                self.require(not va in va_list, "Duplicate signature")
+            if self._is_validator[va]:
+                self.require(va not in va_set, "Duplicate signature")
                 major_count = major_count + 1
-                va_list.append(va)
+                va_set.add(va)
 
         return mig_required <= major_count
 
+    def _spendFeeCredit(self, account: Address, amount: int):
+        credit = self._fee_credits[account]
+        self.require(credit >= amount, "Error: Not enough fee credit")
+        self._fee_credits[account] = credit - amount
+
+    def _accrueBridgingFee(self, toChain: str, data: bytes, amount: int):
+        if amount == 0:
+            return
+
+        feeType = FEE_TYPE if data == None else FEE_WITH_DATA_TYPE
+        self._fee_revenues[toChain][feeType] = SafeMath.add(self._fee_revenues[toChain][feeType], amount)
+        self._accrued_fees.set(SafeMath.add(self._accrued_fees.get(), amount))
+
     def _transferBridgingFee(self, amount: int) -> bool:
         try:
             self.icx.transfer(self._fee_governance.get(), amount)
@@ -490,16 +978,26 @@ class IconMinterContract(IconScoreBase):
 
         return execute_result
 
-    def _payTax(self, token: bytes, tokenAddress: Address, amount: int, decimal: int) -> int:
+    def _payTax(self, sender: Address, token: bytes, tokenAddress: Address, amount: int, decimal: int) -> int:
         tax = SafeMath.div(SafeMath.mul(amount, self._tax_rate.get()), 10000)
 
         if tax != 0:
-            depositId = self._deposit_count.get() + 1
-            self._deposit_count.set(depositId)
-            self.SwapRequest(self._chain.get(), "ORBIT", self.convertAddressToBytes(self.msg.sender), self._tax_receiver.get(), token, self.convertAddressToBytes(tokenAddress), decimal, tax, depositId, None)
+            accrued = SafeMath.add(self._accrued_taxes[tokenAddress], tax)
+            self._accrued_taxes[tokenAddress] = accrued
+            if accrued >= self._tax_settle_thresholds[tokenAddress]:
+                # a settlement of this request's tax alone keeps the requester as fromAddr
+                self._settleTax(sender if accrued == tax else self.address, token, tokenAddress, decimal)
 
         return tax
 
+    def _settleTax(self, sender: Address, token: bytes, tokenAddress: Address, decimal: int):
+        tax = self._accrued_taxes[tokenAddress]
+        self._accrued_taxes[tokenAddress] = 0
+
+        depositId = self._deposit_count.get() + 1
+        self._deposit_count.set(depositId)
+        self.SwapRequest(self._chain.get(), "ORBIT", self.convertAddressToBytes(sender), self._tax_receiver.get(), token, self.convertAddressToBytes(tokenAddress), decimal, tax, depositId, None)
+
     def _burn(self, tokenAddress: Address, user: Address, amount: int) -> bool:
         try:
             token_score = self.create_interface_score(tokenAddress, TokenSupplyInterface)
@@ -530,6 +1028,16 @@ class IconMinterContract(IconScoreBase):
 
         return execute_result
 
+    def _mintBatch(self, tokenAddress: Address, accounts: bytes, amounts: bytes) -> bool:
+        try:
+            token_score = self.create_interface_score(tokenAddress, TokenSupplyInterface)
+            token_score.mintBatch(accounts, amounts)
+            execute_result = True
+        except:
+            execute_result = False
+
+        return execute_result
+
     def _mintNFT(self, nftAddress: Address, user: Address, tokenId: int) -> bool:
         try:
             token_score = self.create_interface_score(nftAddress, NFTSupplyInterface)
@@ -0,0 +1,34 @@
+# packed calldata of withdrawPacked/swapPacked, every field is [length(2)][value]
+# fields are returned as memoryview slices of the payload, so nothing is copied until converted
+LENGTH_BYTES = 2
+SIGNATURE_BYTES = 65
+
+
+def unpack_fields(payload: bytes, count: int) -> list:
+    view = memoryview(payload)
+    fields = []
+    offset = 0
+
+    for _ in range(count):
+        if offset + LENGTH_BYTES > len(view):
+            raise ValueError("Invalid payload length")
+        length = int.from_bytes(view[offset:offset + LENGTH_BYTES], "big")
+        offset += LENGTH_BYTES
+
+        if offset + length > len(view):
+            raise ValueError("Invalid field length")
+        fields.append(view[offset:offset + length])
+        offset += length
+
+    if offset != len(view):
+        raise ValueError("Invalid payload length")
+
+    return fields
+
+
+def split_signatures(sigs) -> list:
+    # sigs is the concatenation of 65 bytes signatures
+    if len(sigs) == 0 or len(sigs) % SIGNATURE_BYTES != 0:
+        raise ValueError("Invalid signatures length")
+
+    return [bytes(sigs[i:i + SIGNATURE_BYTES]) for i in range(0, len(sigs), SIGNATURE_BYTES)]
@@ -14,14 +14,26 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from .type_converter.type_converter import params_type_converter
+from .type_converter.type_converter import params_type_converter, encode_typed_params, decode_typed_params
 from .qualification_check.qualification_check import *
 from .transaction import Transaction
 
 
+class ValidatorConsumerInterface(InterfaceScore):
+    @interface
+    def setValidators(self, _version: int, _walletOwners: str, _required: int):
+        pass
+
+
 class MultiSigWallet(IconScoreBase):
     _MAX_WALLET_OWNER_COUNT = 50
     _MAX_DATA_REQUEST_AMOUNT = 50
+    _STORAGE_VERSION = 3
+    # packed confirmation state: owner version << 64 | confirmation count << 56 | owner bitmask
+    _CONFIRMATION_COUNT_SHIFT = 56
+    _CONFIRMATION_VERSION_SHIFT = 64
+    _CONFIRMATION_MASK = (1 << 56) - 1
+    _FULL_BITMAP_WORD = (1 << 256) - 1
 
     @eventlog(indexed=2)
     def Confirmation(self, _sender: Address, _transactionId: int):
@@ -63,17 +75,44 @@ class MultiSigWallet(IconScoreBase):
     def RequirementChange(self, _required: int):
         pass
 
+    @eventlog(indexed=1)
+    def ConsumerAddition(self, _consumer: Address):
+        pass
+
+    @eventlog(indexed=1)
+    def ConsumerRemoval(self, _consumer: Address):
+        pass
+
     def __init__(self, db: IconScoreDatabase) -> None:
         super().__init__(db)
-        # store transaction instance as a serialized bytes
+        # store transaction instance as a serialized bytes, it is not changed after submission
         # _transactions's key: transaction id(int type)
         self._transactions = DictDB("transactions", db, value_type=bytes)
         # store wallet owners' confirmations of each transaction
         # _confirmations's key: transaction id(int type), address(Address type)
         self._wallet_owners = ArrayDB("wallet_owners", db, value_type=Address)
+        # position of each wallet owner in _wallet_owners plus 1, 0 means not an owner
+        self._wallet_owner_index = DictDB("wallet_owner_index", db, value_type=int)
         self._confirmations = DictDB("confirmations", db, value_type=bool, depth=2)
+        # bitmask and count of confirmations of each transaction, bit i is the owner at _wallet_owners[i]
+        # _confirmation_states's key: transaction id(int type)
+        self._confirmation_states = DictDB("confirmation_states", db, value_type=int)
         self._required = VarDB("required", db, value_type=int)
         self._transaction_count = VarDB('transactionCount', db, value_type=int)
+        self._executed_transaction_count = VarDB("executed_transaction_count", db, value_type=int)
+        # executed flags of transactions, 256 transactions per word
+        # _executed_bitmap's key: transaction id // 256(int type)
+        self._executed_bitmap = DictDB("executed_bitmap", db, value_type=int)
+        # pending transactions as a doubly linked list in id order, links store transaction id plus 1, 0 means none
+        self._pending_head = VarDB("pending_head", db, value_type=int)
+        self._pending_tail = VarDB("pending_tail", db, value_type=int)
+        self._pending_next = DictDB("pending_next", db, value_type=int)
+        self._pending_prev = DictDB("pending_prev", db, value_type=int)
+        # SCOREs which keep a local copy of the wallet owners and the requirement.
+        # every change of them bumps _owner_version and is pushed to the consumers
+        self._consumers = ArrayDB("consumers", db, value_type=Address)
+        self._owner_version = VarDB("owner_version", db, value_type=int)
+        self._storage_version = VarDB("storage_version", db, value_type=int)
 
     def on_install(self, _walletOwners: str, _required: int) -> None:
         super().on_install()
@@ -83,24 +122,63 @@ class MultiSigWallet(IconScoreBase):
 
         for wallet_owner in wallet_owner_list:
             wallet_owner_address = Address.from_string(wallet_owner)
+            self._wallet_owner_does_not_exist(wallet_owner_address)
             self._wallet_owners.put(wallet_owner_address)
+            self._wallet_owner_index[wallet_owner_address] = len(self._wallet_owners)
 
         self._required.set(_required)
         self._transaction_count.set(0)
+        self._owner_version.set(1)
+        self._storage_version.set(self._STORAGE_VERSION)
 
     def on_update(self) -> None:
         super().on_update()
 
+        if self._owner_version.get() == 0:
+            self._owner_version.set(1)
+
+        storage_version = self._storage_version.get()
+        if storage_version < 1:
+            self._migrate_wallet_owner_index()
+        if storage_version < 2:
+            self._migrate_pending_transactions()
+        if storage_version < 3:
+            self._migrate_executed_bitmap()
+        self._storage_version.set(self._STORAGE_VERSION)
+
+    def _migrate_wallet_owner_index(self):
+        for idx, wallet_owner in enumerate(self._wallet_owners):
+            self._wallet_owner_index[wallet_owner] = idx + 1
+
+    def _migrate_pending_transactions(self):
+        # before storage version 3, executed flag is the first byte of the serialized transaction
+        executed_count = 0
+        for tx_id in range(self._transaction_count.get()):
+            if self._transactions[tx_id][0] == 1:
+                executed_count += 1
+            else:
+                self._push_pending_transaction(tx_id)
+        self._executed_transaction_count.set(executed_count)
+
+    def _migrate_executed_bitmap(self):
+        for tx_id in range(self._transaction_count.get()):
+            if self._transactions[tx_id][0] == 1:
+                self._set_executed(tx_id)
+
     @staticmethod
-    def _check_params_format_convertible(json_formatted_params: str):
+    def _convert_params(json_formatted_params: str) -> bytes:
+        # convert params once at submission and return them in a compact binary form used at execution.
         # when user input None as a _params' value,
         # this will be changed to "" when creating Transaction instance.
         # "" will be changed to {} when finally execute transaction. so doesn't check format
+        converted_params = []
         if json_formatted_params != "" and json_formatted_params is not None:
             try:
                 params = json_loads(json_formatted_params)
                 for param in params:
-                    params_type_converter(param["type"], param["value"])
+                    converted_params.append((param["name"],
+                                             param["type"],
+                                             params_type_converter(param["type"], param["value"])))
             except ValueError as e:
                 revert(f"json format error: {e}")
             except IconScoreException as e:
@@ -108,18 +186,26 @@ class MultiSigWallet(IconScoreBase):
             except:
                 revert("can not convert 'params' json data, check the 'params' parameter")
 
+        try:
+            return encode_typed_params(converted_params)
+        except IconScoreException as e:
+            revert(f"{e}")
+
     @staticmethod
     def _only_positive_number(*args):
         for number in args:
             if number < 0:
                 revert("only positive number is accepted")
 
+    def _is_wallet_owner(self, wallet_owner: Address) -> bool:
+        return self._wallet_owner_index[wallet_owner] > 0
+
     def _wallet_owner_does_not_exist(self, wallet_owner: Address):
-        if wallet_owner in self._wallet_owners:
+        if self._is_wallet_owner(wallet_owner):
             revert(f"{wallet_owner} already exists as an owner of the wallet")
 
     def _wallet_owner_exist(self, wallet_owner: Address):
-        if wallet_owner not in self._wallet_owners:
+        if not self._is_wallet_owner(wallet_owner):
             revert(f"{wallet_owner} is not an owner of wallet")
 
     def _transaction_exists(self, transaction_id: int):
@@ -127,19 +213,97 @@ class MultiSigWallet(IconScoreBase):
                 or self._transaction_count.get() <= transaction_id:
             revert(f"transaction id '{transaction_id}' is not exist")
 
-    def _confirmed(self, transaction_id: int, wallet_owner: Address):
-        if not self._confirmations[transaction_id][wallet_owner]:
+    def _confirmed(self, transaction_id: int, wallet_owner: Address, mask: int):
+        if not mask & self._wallet_owner_bit(wallet_owner):
             revert(f"{wallet_owner} has not confirmed to the transaction id '{transaction_id}' yet")
 
-    def _not_confirmed(self, transaction_id: int, wallet_owner: Address):
-        if self._confirmations[transaction_id][wallet_owner]:
+    def _not_confirmed(self, transaction_id: int, wallet_owner: Address, mask: int):
+        if mask & self._wallet_owner_bit(wallet_owner):
             revert(f"{wallet_owner} has already confirmed to the transaction '{transaction_id}'")
 
+    def _wallet_owner_bit(self, wallet_owner: Address) -> int:
+        return 1 << (self._wallet_owner_index[wallet_owner] - 1)
+
+    def _get_confirmation_state(self, transaction_id: int) -> tuple:
+        state = self._confirmation_states[transaction_id]
+        if state >> self._CONFIRMATION_VERSION_SHIFT == self._owner_version.get():
+            return state & self._CONFIRMATION_MASK, (state >> self._CONFIRMATION_COUNT_SHIFT) & 0xff
+
+        # wallet owners have changed since the state was stored(or it is not stored yet),
+        # so rebuild it from the confirmations of current wallet owners
+        mask = 0
+        count = 0
+        for idx, wallet_owner in enumerate(self._wallet_owners):
+            if self._confirmations[transaction_id][wallet_owner]:
+                mask |= 1 << idx
+                count += 1
+
+        return mask, count
+
+    def _set_confirmation_state(self, transaction_id: int, mask: int, count: int):
+        self._confirmation_states[transaction_id] = (self._owner_version.get() << self._CONFIRMATION_VERSION_SHIFT) \
+            | (count << self._CONFIRMATION_COUNT_SHIFT) | mask
+
     def _not_executed(self, transaction_id: int):
         # before call this method, check if transaction is exists(use transaction_exists method)
-        if self._transactions[transaction_id][0] == 1:
+        if self._is_executed(transaction_id):
             revert(f"transaction id '{transaction_id}' has already been executed")
 
+    def _is_executed(self, transaction_id: int) -> bool:
+        return (self._executed_bitmap[transaction_id >> 8] >> (transaction_id & 0xff)) & 1 == 1
+
+    def _set_executed(self, transaction_id: int):
+        word_index = transaction_id >> 8
+        self._executed_bitmap[word_index] = self._executed_bitmap[word_index] | (1 << (transaction_id & 0xff))
+
+    def _push_pending_transaction(self, transaction_id: int):
+        tail = self._pending_tail.get()
+        if tail == 0:
+            self._pending_head.set(transaction_id + 1)
+        else:
+            self._pending_next[tail - 1] = transaction_id + 1
+        self._pending_prev[transaction_id] = tail
+        self._pending_tail.set(transaction_id + 1)
+
+    def _remove_pending_transaction(self, transaction_id: int):
+        prev_link = self._pending_prev[transaction_id]
+        next_link = self._pending_next[transaction_id]
+
+        if prev_link == 0:
+            self._pending_head.set(next_link)
+        else:
+            self._pending_next[prev_link - 1] = next_link
+        if next_link == 0:
+            self._pending_tail.set(prev_link)
+        else:
+            self._pending_prev[next_link - 1] = prev_link
+
+        del self._pending_prev[transaction_id]
+        del self._pending_next[transaction_id]
+
+    def _first_pending_transaction(self, transaction_id: int) -> int:
+        # returns the first pending transaction whose id is not less than 'transaction_id' plus 1, 0 if there isn't
+        transaction_count = self._transaction_count.get()
+        if transaction_count <= transaction_id:
+            return 0
+        if not self._is_executed(transaction_id):
+            return transaction_id + 1
+
+        # a page cursor is the last returned id plus 1, resume from its link while it is still pending
+        if transaction_id > 0 and not self._is_executed(transaction_id - 1):
+            return self._pending_next[transaction_id - 1]
+
+        # otherwise find the next clear bit of the executed bitmap, every id below the count is pending or executed
+        word_index = transaction_id >> 8
+        word = self._executed_bitmap[word_index] | ((1 << (transaction_id & 0xff)) - 1)
+        while word_index << 8 < transaction_count:
+            if word != self._FULL_BITMAP_WORD:
+                pending_id = (word_index << 8) + (~word & (word + 1)).bit_length() - 1
+                return pending_id + 1 if pending_id < transaction_count else 0
+            word_index += 1
+            word = self._executed_bitmap[word_index]
+        return 0
+
     def _check_requirement(self, wallet_owner_count: int, required: int):
         if wallet_owner_count > self._MAX_WALLET_OWNER_COUNT or \
                 required > wallet_owner_count or \
@@ -147,6 +311,23 @@ class MultiSigWallet(IconScoreBase):
                 wallet_owner_count == 0:
             revert("invalid requirement")
 
+    def _notify_consumers(self):
+        owner_version = self._owner_version.get() + 1
+        self._owner_version.set(owner_version)
+
+        if len(self._consumers) == 0:
+            return
+
+        wallet_owners = ",".join(str(wallet_owner) for wallet_owner in self._wallet_owners)
+        required = self._required.get()
+        for consumer in self._consumers:
+            self._push_validators(consumer, owner_version, wallet_owners, required)
+
+    def _push_validators(self, consumer: Address, owner_version: int, wallet_owners: str, required: int):
+        # failure of push reverts the owner change, so that consumers never keep a stale owner set
+        consumer_score = self.create_interface_score(consumer, ValidatorConsumerInterface)
+        consumer_score.setValidators(owner_version, wallet_owners, required)
+
     @payable
     def fallback(self):
         if self.msg.value > 0:
@@ -161,61 +342,136 @@ class MultiSigWallet(IconScoreBase):
     def submitTransaction(self, _destination: Address,
                           _method: str = "", _params: str = "", _value: int = 0, _description: str = ""):
         self._wallet_owner_exist(self.msg.sender)
-        # prevent failure of executing transaction caused by 'params' conversion problems
-        self._check_params_format_convertible(_params)
-        self._only_positive_number(_value)
+        self._submit_transaction(_destination, _method, _params, _value, _description)
 
-        # add transaction
-        transaction_id = self._add_transaction(_destination, _method, _params, _value, _description)
-        # confirm_transaction
-        self.confirmTransaction(transaction_id)
+    @external
+    def submitTransactions(self, _transactions: str):
+        # _transactions: json list of submitTransaction params without '_' prefix
+        # [{"destination": "cx..", "method": "..", "params": "[..]", "value": "0x0", "description": ".."}, ...]
+        self._wallet_owner_exist(self.msg.sender)
+        try:
+            transactions = json_loads(_transactions)
+        except ValueError as e:
+            revert(f"json format error: {e}")
+        self._check_batch_size(transactions)
+
+        for transaction in transactions:
+            try:
+                destination = params_type_converter("Address", transaction["destination"])
+                method = transaction.get("method", "")
+                params = transaction.get("params", "")
+                if isinstance(params, list):
+                    params = json_dumps(params)
+                value = params_type_converter("int", transaction.get("value", 0))
+                description = transaction.get("description", "")
+            except IconScoreException as e:
+                revert(f"{e}")
+            except:
+                revert("can not convert '_transactions' json data, check the '_transactions' parameter")
+
+            # an owner change executed by this transaction may remove the sender, then the rest is skipped
+            if self._submit_transaction(destination, method, params, value, description) \
+                    and not self._is_wallet_owner(self.msg.sender):
+                break
 
     @external
     def confirmTransaction(self, _transactionId: int):
         self._wallet_owner_exist(self.msg.sender)
-        self._transaction_exists(_transactionId)
-        self._not_confirmed(_transactionId, self.msg.sender)
-
-        self._confirmations[_transactionId][self.msg.sender] = True
+        self._confirm_transaction(_transactionId)
 
-        self.Confirmation(self.msg.sender, _transactionId)
+    @external
+    def confirmTransactions(self, _transactionIds: str):
+        # _transactionIds: comma separated transaction ids. e.g. "0x1,0x2,3"
+        self._wallet_owner_exist(self.msg.sender)
+        try:
+            transaction_ids = [params_type_converter("int", transaction_id)
+                               for transaction_id in _transactionIds.replace(" ", "").split(",")]
+        except:
+            revert("can not convert '_transactionIds', check the '_transactionIds' parameter")
+        self._check_batch_size(transaction_ids)
 
-        self._execute_transaction(_transactionId)
+        for transaction_id in transaction_ids:
+            # an owner change executed by this transaction may remove the sender, then the rest is skipped
+            if self._confirm_transaction(transaction_id) and not self._is_wallet_owner(self.msg.sender):
+                break
 
     @external
     def revokeTransaction(self, _transactionId: int):
         self._wallet_owner_exist(self.msg.sender)
         self._transaction_exists(_transactionId)
         self._not_executed(_transactionId)
-        self._confirmed(_transactionId, self.msg.sender)
+        mask, count = self._get_confirmation_state(_transactionId)
+        self._confirmed(_transactionId, self.msg.sender, mask)
 
         self._confirmations[_transactionId][self.msg.sender] = False
+        self._set_confirmation_state(_transactionId, mask & ~self._wallet_owner_bit(self.msg.sender), count - 1)
 
         self.Revocation(self.msg.sender, _transactionId)
 
-    def _add_transaction(self, destination: Address, method: str, params: str, value: int, description: str) -> int:
+    def _check_batch_size(self, items: list):
+        if not isinstance(items, list) or len(items) == 0:
+            revert("empty batch")
+        if len(items) > self._MAX_DATA_REQUEST_AMOUNT:
+            revert("requests that exceed the allowed amount")
+
+    def _submit_transaction(self, destination: Address, method: str, params: str, value: int, description: str) -> bool:
+        # prevent failure of executing transaction caused by 'params' conversion problems
+        typed_params = self._convert_params(params)
+        self._only_positive_number(value)
+
+        # add transaction
+        transaction_id = self._add_transaction(destination, method, params, value, description, typed_params)
+        # confirm_transaction
+        return self._confirm_transaction(transaction_id)
+
+    def _confirm_transaction(self, transaction_id: int) -> bool:
+        # before call this method, check if sender is a wallet owner. returns True if the transaction is executed
+        self._transaction_exists(transaction_id)
+        self._not_executed(transaction_id)
+        mask, count = self._get_confirmation_state(transaction_id)
+        self._not_confirmed(transaction_id, self.msg.sender, mask)
+
+        self._confirmations[transaction_id][self.msg.sender] = True
+        self._set_confirmation_state(transaction_id, mask | self._wallet_owner_bit(self.msg.sender), count + 1)
+
+        self.Confirmation(self.msg.sender, transaction_id)
+
+        return self._execute_transaction(transaction_id)
+
+    def _add_transaction(self, destination: Address, method: str, params: str, value: int, description: str,
+                         typed_params: bytes) -> int:
         transaction = Transaction.create_transaction_with_validation(destination=destination,
                                                                      method=method,
                                                                      params=params,
                                                                      value=value,
-                                                                     description=description)
+                                                                     description=description,
+                                                                     typed_params=typed_params)
         transaction_id = self._transaction_count.get()
 
         self._transactions[transaction_id] = transaction.to_bytes()
+        self._set_confirmation_state(transaction_id, 0, 0)
         self._transaction_count.set(transaction_id + 1)
+        self._push_pending_transaction(transaction_id)
 
         self.Submission(transaction_id)
         return transaction_id
 
-    def _execute_transaction(self, transaction_id: int):
+    def _execute_transaction(self, transaction_id: int) -> bool:
         # as this method can't be called from other SCORE or EOA, doesn't check owner, transactions_id, confirmations.
+        # an executed transaction is not in the pending list any more, so it must not be executed again
+        if self._is_executed(transaction_id):
+            return False
         if self._is_confirmed(transaction_id):
             if self._external_call(self._transactions[transaction_id]):
-                self._transactions[transaction_id] = True.to_bytes(1, "big") + self._transactions[transaction_id][1:]
+                self._set_executed(transaction_id)
+                self._remove_pending_transaction(transaction_id)
+                self._executed_transaction_count.set(self._executed_transaction_count.get() + 1)
 
                 self.Execution(transaction_id)
+                return True
             else:
                 self.ExecutionFailure(transaction_id)
+        return False
 
     def _external_call(self, serialized_tx: bytes) -> bool:
         transaction = Transaction.from_bytes(serialized_tx)
@@ -224,7 +480,11 @@ class MultiSigWallet(IconScoreBase):
         method_name = None if transaction.method == "" else transaction.method
         # if params == "" -> {}
         method_params = {}
-        if transaction.params != "":
+        typed_params = transaction.typed_params
+        if typed_params is not None:
+            method_params = decode_typed_params(typed_params)
+        elif transaction.params != "":
+            # transactions submitted before params are stored converted
             params = json_loads(transaction.params)
             for param in params:
                 method_params[param["name"]] = params_type_converter(param["type"], param["value"])
@@ -243,10 +503,7 @@ class MultiSigWallet(IconScoreBase):
         return execute_result
 
     def _is_confirmed(self, transaction_id) -> bool:
-        count = 0
-        for wallet_owner in self._wallet_owners:
-            if self._confirmations[transaction_id][wallet_owner]:
-                count += 1
+        mask, count = self._get_confirmation_state(transaction_id)
 
         return count == self._required.get()
 
@@ -258,6 +515,8 @@ class MultiSigWallet(IconScoreBase):
         self._check_requirement(len(self._wallet_owners) + 1, self._required.get())
 
         self._wallet_owners.put(_walletOwner)
+        self._wallet_owner_index[_walletOwner] = len(self._wallet_owners)
+        self._notify_consumers()
 
         self.WalletOwnerAddition(_walletOwner)
 
@@ -267,10 +526,11 @@ class MultiSigWallet(IconScoreBase):
         self._wallet_owner_exist(_walletOwner)
         self._wallet_owner_does_not_exist(_newWalletOwner)
 
-        for idx, wallet_owner in enumerate(self._wallet_owners):
-            if wallet_owner == _walletOwner:
-                self._wallet_owners[idx] = _newWalletOwner
-                break
+        idx = self._wallet_owner_index[_walletOwner] - 1
+        self._wallet_owners[idx] = _newWalletOwner
+        self._wallet_owner_index[_newWalletOwner] = idx + 1
+        del self._wallet_owner_index[_walletOwner]
+        self._notify_consumers()
 
         self.WalletOwnerRemoval(_walletOwner)
         self.WalletOwnerAddition(_newWalletOwner)
@@ -284,13 +544,15 @@ class MultiSigWallet(IconScoreBase):
         wallet_owners_count = len(self._wallet_owners)
         self._check_requirement(wallet_owners_count - 1, self._required.get())
 
-        for idx, owner in enumerate(self._wallet_owners):
-            if owner == _walletOwner:
-                if idx == wallet_owners_count - 1:
-                    self._wallet_owners.pop()
-                else:
-                    self._wallet_owners[idx] = self._wallet_owners.pop()
-                break
+        idx = self._wallet_owner_index[_walletOwner] - 1
+        if idx == wallet_owners_count - 1:
+            self._wallet_owners.pop()
+        else:
+            last_wallet_owner = self._wallet_owners.pop()
+            self._wallet_owners[idx] = last_wallet_owner
+            self._wallet_owner_index[last_wallet_owner] = idx + 1
+        del self._wallet_owner_index[_walletOwner]
+        self._notify_consumers()
 
         self.WalletOwnerRemoval(_walletOwner)
 
@@ -300,17 +562,58 @@ class MultiSigWallet(IconScoreBase):
         self._check_requirement(len(self._wallet_owners), _required)
 
         self._required.set(_required)
+        self._notify_consumers()
 
         self.RequirementChange(_required)
 
+    @only_wallet
+    @external
+    def addConsumer(self, _consumer: Address):
+        if not _consumer.is_contract:
+            revert(f"{_consumer} is not a SCORE address")
+        if _consumer in self._consumers:
+            revert(f"{_consumer} already exists as a consumer of the wallet")
+
+        self._consumers.put(_consumer)
+
+        wallet_owners = ",".join(str(wallet_owner) for wallet_owner in self._wallet_owners)
+        self._push_validators(_consumer, self._owner_version.get(), wallet_owners, self._required.get())
+
+        self.ConsumerAddition(_consumer)
+
+    @only_wallet
+    @external
+    def removeConsumer(self, _consumer: Address):
+        consumers_count = len(self._consumers)
+        for idx, consumer in enumerate(self._consumers):
+            if consumer == _consumer:
+                if idx == consumers_count - 1:
+                    self._consumers.pop()
+                else:
+                    self._consumers[idx] = self._consumers.pop()
+                break
+        else:
+            revert(f"{_consumer} is not a consumer of wallet")
+
+        self.ConsumerRemoval(_consumer)
+
     @external(readonly=True)
     def getRequirement(self) -> int:
         return self._required.get()
 
+    @external(readonly=True)
+    def getOwnerVersion(self) -> int:
+        return self._owner_version.get()
+
+    @external(readonly=True)
+    def getConsumers(self) -> list:
+        return [str(consumer) for consumer in self._consumers]
+
     @external(readonly=True)
     def getTransactionInfo(self, _transactionId: int) -> dict:
         if self._transactions[_transactionId] is not None:
             transaction = Transaction.from_bytes(self._transactions[_transactionId])
+            transaction.executed = self._is_executed(_transactionId)
             tx_dict = transaction.to_dict()
             tx_dict["_transactionId"] = _transactionId
             return tx_dict
@@ -319,14 +622,32 @@ class MultiSigWallet(IconScoreBase):
 
     @external(readonly=True)
     def getTransactionsExecuted(self, _transactionId: int) -> bool:
-        if self._transactions[_transactionId] is not None:
-            return bool(self._transactions[_transactionId][0])
-        else:
-            return False
+        return self._is_executed(_transactionId)
 
     @external(readonly=True)
     def checkIfWalletOwner(self, _walletOwner: Address) -> bool:
-        return _walletOwner in self._wallet_owners
+        return self._is_wallet_owner(_walletOwner)
+
+    @external(readonly=True)
+    def verifySignatures(self, _hash: bytes, _sigs: str) -> bool:
+        # recover signers of '_hash' and check if distinct wallet owners among them meet the requirement
+        required = self._required.get()
+        signers = set()
+
+        for sig_str in _sigs.replace(" ", "").split(","):
+            sig = params_type_converter("bytes", sig_str)
+            if len(sig) != 65:
+                revert("invalid signature length")
+
+            pub = recover_key(_hash, sig, False)
+            if len(pub) != 65:
+                revert("invalid public key length")
+
+            signer = Address.from_bytes(sha3_256(pub[1:])[12:])
+            if signer not in signers and self._is_wallet_owner(signer):
+                signers.add(signer)
+
+        return 0 < required <= len(signers)
 
     @external(readonly=True)
     def getWalletOwnerCount(self) -> int:
@@ -348,10 +669,7 @@ class MultiSigWallet(IconScoreBase):
 
     @external(readonly=True)
     def getConfirmationCount(self, _transactionId: int) -> int:
-        count = 0
-        for wallet_owner in self._wallet_owners:
-            if self._confirmations[_transactionId][wallet_owner]:
-                count += 1
+        mask, count = self._get_confirmation_state(_transactionId)
         return count
 
     @external(readonly=True)
@@ -359,25 +677,46 @@ class MultiSigWallet(IconScoreBase):
         self._only_positive_number(_offset, _count)
 
         confirmed_wallet_owners = []
-        wallet_owners_count = len(self._wallet_owners)
+        mask, count = self._get_confirmation_state(_transactionId)
+        mask >>= _offset
 
-        for idx in range(_offset, _offset + _count):
-            if idx >= wallet_owners_count:
-                break
-            if self._confirmations[_transactionId][self._wallet_owners[idx]]:
+        idx = _offset
+        while mask and idx < _offset + _count:
+            if mask & 1:
                 confirmed_wallet_owners.append(str(self._wallet_owners[idx]))
+            mask >>= 1
+            idx += 1
 
         return confirmed_wallet_owners
 
     @external(readonly=True)
     def getTransactionCount(self, _pending: bool = True, _executed: bool = True) -> int:
         tx_count = 0
-        for tx_id in range(self._transaction_count.get()):
-            if (_pending and not self._transactions[tx_id][0]) or (_executed and self._transactions[tx_id][0]):
-                tx_count += 1
+        executed_count = self._executed_transaction_count.get()
+        if _pending:
+            tx_count += self._transaction_count.get() - executed_count
+        if _executed:
+            tx_count += executed_count
 
         return tx_count
 
+    @external(readonly=True)
+    def getPendingTransactionList(self, _cursor: int, _count: int) -> list:
+        # returns pending transactions whose id is not less than '_cursor', in id order.
+        # to get the next page, use the last returned transaction id plus 1 as '_cursor'
+        self._only_positive_number(_cursor, _count)
+
+        if _count > self._MAX_DATA_REQUEST_AMOUNT:
+            revert("requests that exceed the allowed amount")
+
+        transaction_list = []
+        link = self._first_pending_transaction(_cursor)
+        while link != 0 and len(transaction_list) < _count:
+            transaction_list.append(self._get_transaction_dict(link - 1))
+            link = self._pending_next[link - 1]
+
+        return transaction_list
+
     @external(readonly=True)
     def getTransactionList(self, _offset: int, _count: int, _pending: bool = True, _executed: bool = True) -> list:
         self._only_positive_number(_offset, _count)
@@ -391,12 +730,26 @@ class MultiSigWallet(IconScoreBase):
         # prevent searching not existed transaction
         _count = _offset + _count if total_transaction_count >= _offset + _count else total_transaction_count
 
-        for tx_id in range(_offset, _count):
-            if (_pending and not self._transactions[tx_id][0]) or (_executed and self._transactions[tx_id][0]):
-                transaction = Transaction.from_bytes(self._transactions[tx_id])
+        if _pending and not _executed:
+            # walk the pending transactions only, instead of every transaction in the range
+            link = self._first_pending_transaction(_offset)
+            while link != 0 and link - 1 < _count:
+                transaction_list.append(self._get_transaction_dict(link - 1))
+                link = self._pending_next[link - 1]
 
-                tx_dict = transaction.to_dict()
-                tx_dict["_transactionId"] = tx_id
-                transaction_list.append(tx_dict)
+            return transaction_list
+
+        for tx_id in range(_offset, _count):
+            executed = self._is_executed(tx_id)
+            if (_pending and not executed) or (_executed and executed):
+                transaction_list.append(self._get_transaction_dict(tx_id))
 
         return transaction_list
+
+    def _get_transaction_dict(self, transaction_id: int) -> dict:
+        transaction = Transaction.from_bytes(self._transactions[transaction_id])
+        transaction.executed = self._is_executed(transaction_id)
+
+        tx_dict = transaction.to_dict()
+        tx_dict["_transactionId"] = transaction_id
+        return tx_dict
@@ -17,23 +17,38 @@
 from iconservice import *
 
 # address, value fix
+# executed flag of the record is the value at submission, the wallet keeps the current one separately
 ADDRESS_BYTE_LEN = 21
 DEFAULT_VALUE_BYTES = 16
 DATA_BYTE_ORDER = "big"
+FIXED_VARS_BYTE_LEN = 1 + ADDRESS_BYTE_LEN + DEFAULT_VALUE_BYTES
 
 MAX_METHOD_LEN = 100
 MAX_PARAMS_LEN = 1000
 MAX_DESCRIPTION_LEN = 1000
 
+# flexible vars(method, params, description) encoding.
+# legacy records store them as a json object, which always starts with '{'.
+# versioned records start with a version byte followed by length-prefixed utf-8 strings.
+# version 2 appends the converted params(see type_converter.encode_typed_params) to the end of the record.
+LEGACY_JSON_FORMAT = b'{'[0]
+BINARY_FORMAT_V1 = 1
+BINARY_FORMAT_V2 = 2
+FLEXIBLE_VAR_LEN_BYTES = 2
+
 
 class Transaction:
+    __slots__ = ('_executed', '_destination', '_value', '_method', '_params', '_description', '_typed_params', '_typed_params_decoded', '_buf')
+
     def __init__(self,
                  destination: Address,
                  method: str,
                  params: str,
                  value: int,
                  description: str,
-                 executed: bool):
+                 executed: bool,
+                 typed_params: bytes = None,
+                 buf: bytes = None):
 
         self._executed = executed
         self._destination = destination
@@ -41,6 +56,11 @@ class Transaction:
         self._method = method
         self._params = params
         self._description = description
+        self._typed_params = typed_params
+        # typed params are None for legacy and version 1 records, so whether they are decoded is kept separately
+        self._typed_params_decoded = buf is None
+        # serialized flexible vars which are not decoded yet
+        self._buf = buf
 
     @property
     def executed(self) -> bool:
@@ -56,10 +76,14 @@ class Transaction:
 
     @property
     def method(self) -> str:
+        if self._method is None:
+            self._decode_flexible_vars(0)
         return self._method
 
     @property
     def params(self) -> str:
+        if self._params is None:
+            self._decode_flexible_vars(1)
         return self._params
 
     @property
@@ -68,12 +92,26 @@ class Transaction:
 
     @property
     def description(self) -> str:
+        if self._description is None:
+            self._decode_flexible_vars(2)
         return self._description
 
+    @property
+    def typed_params(self) -> bytes:
+        # None if the record is stored before params are converted at submission
+        if not self._typed_params_decoded:
+            self._decode_flexible_vars(3)
+        return self._typed_params
+
     def to_dict(self):
-        tx_dict = self.__dict__
-        tx_dict['_destination'] = str(self.destination)
-        return tx_dict
+        return {
+            "_executed": self.executed,
+            "_destination": str(self.destination),
+            "_value": self.value,
+            "_method": self.method,
+            "_params": self.params,
+            "_description": self.description
+        }
 
     @classmethod
     def create_transaction_with_validation(cls,
@@ -82,6 +120,7 @@ class Transaction:
                                            params: str,
                                            value: int,
                                            description: str,
+                                           typed_params: bytes = None,
                                            executed: bool = False):
         # as None type can't be converted to bytes, must be changed to ""
         method = "" if method is None else method
@@ -101,22 +140,66 @@ class Transaction:
                    value=value,
                    method=method,
                    params=params,
-                   description=description)
+                   description=description,
+                   typed_params=typed_params)
 
     @classmethod
     def from_bytes(cls, buf: bytes):
+        # only fixed size vars are decoded here, flexible vars are decoded when they are accessed
         encoded_executed = bool(buf[0])
         encoded_destination = buf[1: 1 + ADDRESS_BYTE_LEN]
-        encoded_value = buf[1 + ADDRESS_BYTE_LEN: 1 + ADDRESS_BYTE_LEN + DEFAULT_VALUE_BYTES]
-        flexible_vars_json_string = buf[1 + ADDRESS_BYTE_LEN + DEFAULT_VALUE_BYTES:].decode()
-        flexible_vars_json = json_loads(flexible_vars_json_string)
+        encoded_value = buf[1 + ADDRESS_BYTE_LEN: FIXED_VARS_BYTE_LEN]
 
         return cls(executed=encoded_executed,
                    destination=Address.from_bytes(encoded_destination),
                    value=int.from_bytes(encoded_value, DATA_BYTE_ORDER),
-                   method=flexible_vars_json["method"],
-                   params=flexible_vars_json["params"],
-                   description=flexible_vars_json["description"])
+                   method=None,
+                   params=None,
+                   description=None,
+                   buf=buf)
+
+    def _decode_flexible_vars(self, target: int):
+        # target is the position of the flexible var to decode: 0 method, 1 params, 2 description, 3 typed params
+        buf = self._buf
+        record_format = buf[FIXED_VARS_BYTE_LEN]
+        if record_format == LEGACY_JSON_FORMAT:
+            flexible_vars_json = json_loads(buf[FIXED_VARS_BYTE_LEN:].decode())
+            self._method = flexible_vars_json["method"]
+            self._params = flexible_vars_json["params"]
+            self._description = flexible_vars_json["description"]
+            self._typed_params_decoded = True
+            return
+
+        if record_format != BINARY_FORMAT_V1 and record_format != BINARY_FORMAT_V2:
+            revert("unsupported transaction format")
+
+        view = memoryview(buf)
+        offset = FIXED_VARS_BYTE_LEN + 1
+        if target == 3:
+            self._typed_params_decoded = True
+            if record_format == BINARY_FORMAT_V2:
+                for _ in range(3):
+                    offset += FLEXIBLE_VAR_LEN_BYTES + int.from_bytes(view[offset: offset + FLEXIBLE_VAR_LEN_BYTES], DATA_BYTE_ORDER)
+                self._typed_params = bytes(view[offset:])
+            return
+
+        for idx in range(target + 1):
+            length = int.from_bytes(view[offset: offset + FLEXIBLE_VAR_LEN_BYTES], DATA_BYTE_ORDER)
+            offset += FLEXIBLE_VAR_LEN_BYTES
+            if idx == target:
+                decoded = bytes(view[offset: offset + length]).decode()
+                if target == 0:
+                    self._method = decoded
+                elif target == 1:
+                    self._params = decoded
+                else:
+                    self._description = decoded
+            offset += length
+
+    @staticmethod
+    def _encode_flexible_var(var: str) -> bytes:
+        encoded_var = var.encode(encoding="utf-8")
+        return len(encoded_var).to_bytes(FLEXIBLE_VAR_LEN_BYTES, DATA_BYTE_ORDER) + encoded_var
 
     def to_bytes(self) -> bytes:
         encoded_executed = self.executed.to_bytes(1, DATA_BYTE_ORDER)
@@ -125,10 +208,11 @@ class Transaction:
         destination_bytes = destination_bytes if len(destination_bytes) == ADDRESS_BYTE_LEN \
             else b'\x00' + destination_bytes
 
-        flexible_vars = dict()
-        flexible_vars["method"] = self.method
-        flexible_vars["params"] = self.params
-        flexible_vars["description"] = self.description
-
-        encoded_flexible_vars_json = json_dumps(flexible_vars).encode(encoding="utf-8")
-        return encoded_executed + destination_bytes + encoded_value + encoded_flexible_vars_json
+        record_format = BINARY_FORMAT_V1 if self.typed_params is None else BINARY_FORMAT_V2
+        encoded_flexible_vars = record_format.to_bytes(1, DATA_BYTE_ORDER) \
+            + self._encode_flexible_var(self.method) \
+            + self._encode_flexible_var(self.params) \
+            + self._encode_flexible_var(self.description)
+        if self.typed_params is not None:
+            encoded_flexible_vars += self.typed_params
+        return encoded_executed + destination_bytes + encoded_value + encoded_flexible_vars
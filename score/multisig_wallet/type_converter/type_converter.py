@@ -81,3 +81,70 @@ def _convert_value_bytes(value) -> bytes:
     else:
         raise IconScoreException("type and value's actual type are not match.")
     return result
+
+
+# compact binary form of converted params, which is stored at submission and used at execution.
+# [param count(1)] + [name length(1)][name][type code(1)][value length(2)][value] * param count
+_TYPE_CODES = {"int": 0, "str": 1, "bool": 2, "Address": 3, "bytes": 4}
+_TYPE_NAMES = {code: name for name, code in _TYPE_CODES.items()}
+_BYTE_ORDER = "big"
+
+
+def encode_typed_params(params: list) -> bytes:
+    # params: list of (name, type, converted value)
+    if len(params) > 0xff:
+        raise IconScoreException("too many params")
+
+    encoded = len(params).to_bytes(1, _BYTE_ORDER)
+    for name, param_type, value in params:
+        encoded_name = name.encode()
+        encoded_value = _encode_value(param_type, value)
+        if len(encoded_name) > 0xff or len(encoded_value) > 0xffff:
+            raise IconScoreException("too long param")
+
+        encoded += len(encoded_name).to_bytes(1, _BYTE_ORDER) + encoded_name \
+            + _TYPE_CODES[param_type].to_bytes(1, _BYTE_ORDER) \
+            + len(encoded_value).to_bytes(2, _BYTE_ORDER) + encoded_value
+    return encoded
+
+
+def decode_typed_params(buf: bytes) -> dict:
+    view = memoryview(buf)
+    params = {}
+    offset = 1
+    for _ in range(view[0]):
+        name_len = view[offset]
+        name = bytes(view[offset + 1: offset + 1 + name_len]).decode()
+        offset += 1 + name_len
+
+        param_type = _TYPE_NAMES[view[offset]]
+        value_len = int.from_bytes(view[offset + 1: offset + 3], _BYTE_ORDER)
+        offset += 3
+
+        params[name] = _decode_value(param_type, bytes(view[offset: offset + value_len]))
+        offset += value_len
+    return params
+
+
+def _encode_value(param_type: str, value) -> bytes:
+    if param_type == "int":
+        return value.to_bytes((value.bit_length() + 8) // 8, _BYTE_ORDER, signed=True)
+    elif param_type == "str":
+        return value.encode()
+    elif param_type == "bool":
+        return value.to_bytes(1, _BYTE_ORDER)
+    elif param_type == "Address":
+        return value.to_bytes()
+    return value
+
+
+def _decode_value(param_type: str, value: bytes):
+    if param_type == "int":
+        return int.from_bytes(value, _BYTE_ORDER, signed=True)
+    elif param_type == "str":
+        return value.decode()
+    elif param_type == "bool":
+        return bool(value[0])
+    elif param_type == "Address":
+        return Address.from_bytes(value)
+    return value
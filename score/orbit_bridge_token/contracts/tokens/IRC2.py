@@ -19,8 +19,14 @@ class InsufficientAllowanceError(Exception):
 class InvalidMessageSender(Exception):
     pass
 
+class InvalidBatchError(Exception):
+    pass
+
 ZERO_ADDRESS = Address.from_string("hx0000000000000000000000000000000000000000")
 
+MINT_BATCH_ACCOUNT_LEN = 21
+MINT_BATCH_AMOUNT_LEN = 32
+
 # An interface of tokenFallback.
 # Receiving SCORE that has implemented this interface can handle
 # the receiving or further routine.
@@ -333,6 +339,43 @@ class IRC2(IconScoreBase, TokenStandard):
         self.Mint(_to, _value)
         self.Transfer(ZERO_ADDRESS, _to, _value, b'mint')
 
+    def _mintBatch(self, _accounts: bytes, _amounts: bytes) -> None:
+        '''
+        Creates tokens for many accounts at once.
+        Increases the balance of each account and the total supply once.
+        This is an internal function.
+
+        :param _accounts: Concatenated 21 bytes account addresses.
+        :param _amounts: Concatenated 32 bytes big-endian amounts, in the order of `_accounts`.
+
+        Raises
+        InvalidBatchError
+            if the lengths of `_accounts` and `_amounts` do not describe the same number of items.
+        '''
+        if self.msg.sender != self._minter.get():
+            raise InvalidMessageSender("Invalid Sender")
+
+        if len(_accounts) == 0 or len(_accounts) % MINT_BATCH_ACCOUNT_LEN != 0:
+            raise InvalidBatchError("Invalid Accounts")
+
+        count = len(_accounts) // MINT_BATCH_ACCOUNT_LEN
+        if len(_amounts) != count * MINT_BATCH_AMOUNT_LEN:
+            raise InvalidBatchError("Invalid Amounts")
+
+        total = 0
+        for i in range(count):
+            _to = Address.from_bytes(_accounts[i * MINT_BATCH_ACCOUNT_LEN:(i + 1) * MINT_BATCH_ACCOUNT_LEN])
+            _value = int.from_bytes(_amounts[i * MINT_BATCH_AMOUNT_LEN:(i + 1) * MINT_BATCH_AMOUNT_LEN], "big")
+
+            self._balances[_to] = SafeMath.add(self._balances[_to], _value)
+            total = SafeMath.add(total, _value)
+
+            # Emits an event log Mint
+            self.Mint(_to, _value)
+            self.Transfer(ZERO_ADDRESS, _to, _value, b'mint')
+
+        self._total_supply.set(SafeMath.add(self._total_supply.get(), total))
+
     def _burn(self, account: Address, amount: int) -> None:
         '''
         Destroys `amount` number of tokens from `account`
@@ -28,3 +28,15 @@ class IRC2Mintable(IRC2):
 		:param _amount: Number of tokens to be created at the account.
 		'''
 		super()._mint(_account, _amount)
+
+	@external
+	def mintBatch(self, _accounts: bytes, _amounts: bytes) -> None:
+		'''
+		Creates tokens for many accounts in a single call.
+		Increases the balance of each account, and the total supply once.
+		See {IRC2-_mintBatch}
+
+		:param _accounts: Concatenated 21 bytes addresses of the accounts.
+		:param _amounts: Concatenated 32 bytes big-endian amounts, in the order of `_accounts`.
+		'''
+		super()._mintBatch(_accounts, _amounts)
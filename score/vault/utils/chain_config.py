@@ -0,0 +1,38 @@
+# per-chain configuration packed into a single storage value
+# [is valid(1)][address length(2)][uints length(2)][fee(32)][fee with data(32)]
+DATA_BYTE_ORDER = "big"
+LENGTH_BYTES = 2
+FEE_BYTES = 32
+
+class ChainConfig:
+    __slots__ = ('is_valid', 'address_length', 'uints_length', 'fee', 'fee_with_data')
+
+    def __init__(self, is_valid: bool, address_length: int, uints_length: int, fee: int, fee_with_data: int):
+        self.is_valid = is_valid
+        self.address_length = address_length
+        self.uints_length = uints_length
+        self.fee = fee
+        self.fee_with_data = fee_with_data
+
+    def bridging_fee(self, data: bytes) -> int:
+        return self.fee if data == None else self.fee_with_data
+
+    @classmethod
+    def from_bytes(cls, buf: bytes):
+        offset = 1
+        address_length = int.from_bytes(buf[offset: offset + LENGTH_BYTES], DATA_BYTE_ORDER)
+        offset += LENGTH_BYTES
+        uints_length = int.from_bytes(buf[offset: offset + LENGTH_BYTES], DATA_BYTE_ORDER)
+        offset += LENGTH_BYTES
+        fee = int.from_bytes(buf[offset: offset + FEE_BYTES], DATA_BYTE_ORDER)
+        offset += FEE_BYTES
+        fee_with_data = int.from_bytes(buf[offset: offset + FEE_BYTES], DATA_BYTE_ORDER)
+
+        return cls(bool(buf[0]), address_length, uints_length, fee, fee_with_data)
+
+    def to_bytes(self) -> bytes:
+        return self.is_valid.to_bytes(1, DATA_BYTE_ORDER) \
+            + self.address_length.to_bytes(LENGTH_BYTES, DATA_BYTE_ORDER) \
+            + self.uints_length.to_bytes(LENGTH_BYTES, DATA_BYTE_ORDER) \
+            + self.fee.to_bytes(FEE_BYTES, DATA_BYTE_ORDER) \
+            + self.fee_with_data.to_bytes(FEE_BYTES, DATA_BYTE_ORDER)
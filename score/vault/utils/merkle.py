@@ -0,0 +1,21 @@
+from iconservice import sha_256
+
+# merkle tree over withdraw/swap hashes, an inner node is sha_256 of its two children in sorted order
+# proof is the concatenation of the 32 bytes sibling hashes from the leaf up to the root
+NODE_BYTES = 32
+MAX_PROOF_DEPTH = 32
+
+
+def verify_merkle_proof(leaf: bytes, root: bytes, proof: bytes) -> bool:
+    if len(proof) % NODE_BYTES != 0 or len(proof) // NODE_BYTES > MAX_PROOF_DEPTH:
+        return False
+
+    node = leaf
+    for i in range(0, len(proof), NODE_BYTES):
+        sibling = proof[i:i + NODE_BYTES]
+        if node <= sibling:
+            node = sha_256(node + sibling)
+        else:
+            node = sha_256(sibling + node)
+
+    return node == root
@@ -3,9 +3,19 @@ from .utils.checks import only_governance
 from .utils.checks import only_activated
 from .utils.type_converter import params_type_converter
 from .utils.SafeMath import SafeMath
+from .utils.chain_config import ChainConfig
+from .utils.merkle import verify_merkle_proof
+from .utils.packed import unpack_fields, split_signatures
 
 EOA_ZERO = Address.from_string("hx" + "0" * 40)
 ICX_ADDR = Address.from_string("cx" + "0" * 40)
+MAX_WITHDRAW_BATCH = 30
+MAX_DEPOSIT_BATCH = 50
+MAX_DEPOSIT_ID_QUERY = 1024
+MAX_NFT_CUSTODY_QUERY = 100
+PACKED_WITHDRAW_FIELD_COUNT = 9
+FEE_TYPE = "fee"
+FEE_WITH_DATA_TYPE = "feeWithData"
 
 class TokenInformationInterface(InterfaceScore):
 	@interface
@@ -48,6 +58,22 @@ class MultiSigWalletInterface(InterfaceScore):
     def getRequirement(self) -> int:
         pass
 
+    @interface
+    def verifySignatures(self, _hash: bytes, _sigs: str) -> bool:
+        pass
+
+    @interface
+    def getOwnerVersion(self) -> int:
+        pass
+
+    @interface
+    def getWalletOwnerCount(self) -> int:
+        pass
+
+    @interface
+    def getWalletOwners(self, _offset: int, _count: int) -> list:
+        pass
+
 class FarmInterface(InterfaceScore):
     @interface
     def deposit(self, amount: int) -> None:
@@ -87,6 +113,14 @@ class IconVaultContract(IconScoreBase):
     def WithdrawNFT(self, fromChain: str, fromAddr: bytes, toAddr: bytes, token: bytes, bytes32s: bytes, uints: bytes, data: bytes):
         pass
 
+    @eventlog
+    def WithdrawRootSubmitted(self, root: bytes):
+        pass
+
+    @eventlog
+    def FeesSwept(self, receiver: Address, amount: int):
+        pass
+
     @eventlog
     def BridgeReceiverResult(self, success: bool, fromAddr: bytes, token: Address, data: bytes):
         pass
@@ -101,18 +135,62 @@ class IconVaultContract(IconScoreBase):
         self._deposit_count = VarDB("deposit_count", db, value_type=int)
 
         self._is_used_hash = DictDB("is_used_hash", db, value_type=bool)
+        # replay protection by (fromChain, depositId) for chains enabled by governance, 256 ids per word
+        # _processed_deposits's key: fromChain, depositId // 256(int type)
+        self._deposit_id_replay = DictDB("deposit_id_replay", db, value_type=bool)
+        self._processed_deposits = DictDB("processed_deposits", db, value_type=int, depth=2)
         self._is_valid_chain = DictDB("is_valid_chain", db, value_type=bool)
+        # merkle roots of withdraw hashes signed by the validators, see submitWithdrawRoot
+        self._verified_roots = DictDB("verified_roots", db, value_type=bool)
 
         self._farms = DictDB("farms", db, value_type=Address)
 
+        # NFTs held by the vault per collection, deposited after the ledger was introduced
+        # _nft_custody_index's key: nftAddress, tokenId. value is the index in _nft_custody_ids plus 1
+        self._nft_custody_index = DictDB("nft_custody_index", db, value_type=int, depth=2)
+        self._nft_custody_ids = DictDB("nft_custody_ids", db, value_type=int, depth=2)
+        self._nft_custody_count = DictDB("nft_custody_count", db, value_type=int)
+        # hot reserve of farmed tokens kept in the vault, rebalanced with the farm when it crosses a watermark
+        self._hot_reserves = DictDB("hot_reserves", db, value_type=int)
+        self._reserve_low_watermarks = DictDB("reserve_low_watermarks", db, value_type=int)
+        self._reserve_high_watermarks = DictDB("reserve_high_watermarks", db, value_type=int)
+
         self._tax_rate = VarDB("tax_rate", db, value_type=int)
         self._tax_receiver = VarDB("tax_receiver", db, value_type=bytes)
+        # tax accrued per token until it reaches the token's settle threshold or settleTax is called
+        self._accrued_taxes = DictDB("accrued_taxes", db, value_type=int)
+        self._tax_settle_thresholds = DictDB("tax_settle_thresholds", db, value_type=int)
 
         self._policy_admin = VarDB("policy_admin", db, value_type=Address)
         self._chain_fee = DictDB("chain_fee", db, value_type=int)
         self._chain_fee_with_data = DictDB("chain_fee_with_data", db, value_type=int)
         self._chain_uints_length = DictDB("chain_uints_length", db, value_type=int)
         self._chain_address_length = DictDB("chain_address_length", db, value_type=int)
+        # packed ChainConfig of each chain id, chains without it are read from the DictDBs above
+        self._chain_configs = DictDB("chain_configs", db, value_type=bytes)
+        # decimals of tokens, filled on first use or by governance. 0 means not cached
+        self._token_decimals = DictDB("token_decimals", db, value_type=int)
+
+        # prepaid ICX bridging fees of accounts, spent by deposits through tokenFallback
+        self._fee_credits = DictDB("fee_credits", db, value_type=int)
+        self._total_fee_credit = VarDB("total_fee_credit", db, value_type=int)
+        # tokens trusted to report _from in tokenFallback, only they can spend fee credits
+        self._fee_credit_tokens = DictDB("fee_credit_tokens", db, value_type=bool)
+        # bridging fees held by this contract until sweepFees sends them to the fee governance
+        self._accrued_fees = VarDB("accrued_fees", db, value_type=int)
+        # cumulative bridging fee revenue, key: toChain, FEE_TYPE or FEE_WITH_DATA_TYPE
+        self._fee_revenues = DictDB("fee_revenues", db, value_type=int, depth=2)
+        # govId(32) + withdraw hash prefix(hubContract + fromChain + chain), key: hubContract + fromChain
+        self._withdraw_contexts = DictDB("withdraw_contexts", db, value_type=bytes)
+
+        # local copy of the governance wallet owners, pushed by MultiSigWallet.setValidators
+        # _validator_version == 0 means not synced, then signatures are checked through the wallet
+        self._validator_version = VarDB("validator_version", db, value_type=int)
+        self._validator_required = VarDB("validator_required", db, value_type=int)
+        self._validators = ArrayDB("validators", db, value_type=Address)
+        self._is_validator = DictDB("is_validator", db, value_type=bool)
+        # upper bound of signatures accepted by _validate_signature, 0 means no bound
+        self._max_signatures = VarDB("max_signatures", db, value_type=int)
 
     def on_install(self, _governance: Address, _fee_governance: Address, _bridging_fee: int) -> None:
         super().on_install()
@@ -127,10 +205,12 @@ class IconVaultContract(IconScoreBase):
         super().on_update()
 
         self._policy_admin.set(EOA_ZERO)
-        self._chain_uints_length[self.getChainId("KLAYTN")] = 96
-        self._chain_address_length[self.getChainId("KLAYTN")] = 20
-        self._chain_uints_length[self.getChainId("ORBIT")] = 96
-        self._chain_address_length[self.getChainId("ORBIT")] = 20
+        for chainSymbol in ("KLAYTN", "ORBIT"):
+            chainId = self.getChainId(chainSymbol)
+            config = self._getChainConfig(chainId)
+            config.uints_length = 96
+            config.address_length = 20
+            self._chain_configs[chainId] = config.to_bytes()
 
     def require(self, execute_result: bool, msg: str):
         if not execute_result:
@@ -142,7 +222,7 @@ class IconVaultContract(IconScoreBase):
 
     @external(readonly=True)
     def isValidChain(self, chainSymbol: str) -> bool:
-        return self._is_valid_chain[self.getChainId(chainSymbol)]
+        return self._getChainConfig(self.getChainId(chainSymbol)).is_valid
 
     @external(readonly=True)
     def governance(self) -> Address:
@@ -161,6 +241,51 @@ class IconVaultContract(IconScoreBase):
         hash_bytes = hubContract + self._chain.get().encode() + self.convertAddressToBytes(self.address)
         return sha_256(hash_bytes)
 
+    @external(readonly=True)
+    def isUsedHash(self, _hash: bytes) -> bool:
+        return self._is_used_hash[_hash]
+
+    @external(readonly=True)
+    def isDepositIdReplay(self, fromChain: str) -> bool:
+        return self._deposit_id_replay[fromChain]
+
+    @external(readonly=True)
+    def isDepositProcessed(self, fromChain: str, depositId: int) -> bool:
+        """NOTE
+        only covers deposits processed after deposit id replay was enabled for fromChain,
+        older ones are recorded by hash in isUsedHash
+        """
+        return (self._processed_deposits[fromChain][depositId >> 8] >> (depositId & 0xff)) & 1 == 1
+
+    @external(readonly=True)
+    def getUnprocessedDepositIds(self, fromChain: str, _from: int, _to: int) -> list:
+        """NOTE
+        deposit ids in [_from, _to] not marked as processed, see isDepositProcessed
+        """
+        self.require(0 <= _from <= _to, "Error: Invalid range")
+        self.require(_to - _from < MAX_DEPOSIT_ID_QUERY, "Error: Too wide range")
+
+        bitmaps = self._processed_deposits[fromChain]
+        unprocessed = []
+        word_index = -1
+        word = 0
+        for depositId in range(_from, _to + 1):
+            if depositId >> 8 != word_index:
+                word_index = depositId >> 8
+                word = bitmaps[word_index]
+            if (word >> (depositId & 0xff)) & 1 == 0:
+                unprocessed.append(depositId)
+
+        return unprocessed
+
+    @external(readonly=True)
+    def isVerifiedRoot(self, root: bytes) -> bool:
+        return self._verified_roots[root]
+
+    @external(readonly=True)
+    def getWithdrawContext(self, hubContract: bytes, fromChain: str) -> bytes:
+        return self._withdraw_contexts[hubContract + fromChain.encode()]
+
     @external(readonly=True)
     def chain(self) -> str:
         return self._chain.get()
@@ -177,20 +302,79 @@ class IconVaultContract(IconScoreBase):
     def getFarmAddress(self, token: Address) -> Address:
         return self._farms[token]
 
+    @external(readonly=True)
+    def getHotReserve(self, token: Address) -> dict:
+        return {
+            "reserve": self._hot_reserves[token],
+            "lowWatermark": self._reserve_low_watermarks[token],
+            "highWatermark": self._reserve_high_watermarks[token]
+        }
+
     @external(readonly=True)
     def getChainId(self, chain: str) -> bytes:
         return sha_256(chain.encode())
 
     @external(readonly=True)
     def getTokenDecimal(self, tokenAddress: Address) -> int:
+        decimal = self._token_decimals[tokenAddress]
+        if decimal != 0:
+            return decimal
+
         token_score = self.create_interface_score(tokenAddress, TokenInformationInterface)
         return token_score.decimals()
 
+    @external(readonly=True)
+    def accruedTaxOf(self, token: Address) -> int:
+        return self._accrued_taxes[token]
+
+    @external(readonly=True)
+    def taxSettleThreshold(self, token: Address) -> int:
+        return self._tax_settle_thresholds[token]
+
+    @external(readonly=True)
+    def accruedFees(self) -> int:
+        return self._accrued_fees.get()
+
+    @external(readonly=True)
+    def getFeeRevenue(self, chain: str) -> dict:
+        revenues = self._fee_revenues[chain]
+        return {FEE_TYPE: revenues[FEE_TYPE], FEE_WITH_DATA_TYPE: revenues[FEE_WITH_DATA_TYPE]}
+
+    @external(readonly=True)
+    def isFeeCreditToken(self, token: Address) -> bool:
+        return self._fee_credit_tokens[token]
+
+    @external(readonly=True)
+    def feeCreditOf(self, account: Address) -> int:
+        return self._fee_credits[account]
+
     @external(readonly=True)
     def getTokenBalance(self, tokenAddress: Address, owner: Address) -> int:
         token_score = self.create_interface_score(tokenAddress, TokenInformationInterface)
         return token_score.balanceOf(owner)
 
+    @external(readonly=True)
+    def isNFTInCustody(self, nftAddress: Address, tokenId: int) -> bool:
+        return self._nft_custody_index[nftAddress][tokenId] != 0
+
+    @external(readonly=True)
+    def getNFTCustodyCount(self, nftAddress: Address) -> int:
+        return self._nft_custody_count[nftAddress]
+
+    @external(readonly=True)
+    def getNFTsInCustody(self, nftAddress: Address, _offset: int, _count: int) -> list:
+        self.require(_offset >= 0 and 0 < _count <= MAX_NFT_CUSTODY_QUERY, "Error: Invalid range")
+
+        token_ids = []
+        custody_count = self._nft_custody_count[nftAddress]
+
+        for idx in range(_offset, _offset + _count):
+            if idx >= custody_count:
+                break
+            token_ids.append(self._nft_custody_ids[nftAddress][idx])
+
+        return token_ids
+
     @external(readonly=True)
     def getNFTOwner(self, nftAddress: Address, tokenId: int) -> Address:
         token_score = self.create_interface_score(nftAddress, NFTInformationInterface)
@@ -213,49 +397,138 @@ class IconVaultContract(IconScoreBase):
 
     @external(readonly=True)
     def chainFee(self, chain: str) -> int:
-        return self._chain_fee[self.getChainId(chain)]
+        return self._getChainConfig(self.getChainId(chain)).fee
 
     @external(readonly=True)
     def chainFeeWithData(self, chain: str) -> int:
-        return self._chain_fee_with_data[self.getChainId(chain)]
+        return self._getChainConfig(self.getChainId(chain)).fee_with_data
 
     @external(readonly=True)
     def chainUintsLength(self, chain: str) -> int:
-        return self._chain_uints_length[self.getChainId(chain)]
+        return self._getChainConfig(self.getChainId(chain)).uints_length
 
     @external(readonly=True)
     def chainAddressLength(self, chain: str) -> int:
-        return self._chain_address_length[self.getChainId(chain)]
+        return self._getChainConfig(self.getChainId(chain)).address_length
+
+    @external(readonly=True)
+    def validatorVersion(self) -> int:
+        return self._validator_version.get()
+
+    @external(readonly=True)
+    def validatorRequired(self) -> int:
+        return self._validator_required.get()
+
+    @external(readonly=True)
+    def maxSignatures(self) -> int:
+        return self._max_signatures.get()
+
+    @external(readonly=True)
+    def getValidators(self) -> list:
+        return [str(validator) for validator in self._validators]
 
     @only_governance
     @external
     def transferOwnership(self, _governance: Address):
         self._governance.set(_governance)
+        self._clearValidators()
+        self._validator_version.set(0)
+
+    @only_governance
+    @external
+    def setValidators(self, _version: int, _walletOwners: str, _required: int):
+        self.require(_version > 0 and _version >= self._validator_version.get(), "Error: Invalid validator version")
+        wallet_owner_list = _walletOwners.replace(" ", "").split(",")
+        self._setValidators(_version, [Address.from_string(wallet_owner) for wallet_owner in wallet_owner_list], _required)
+
+    @external
+    def refreshValidators(self):
+        mig_score = self.create_interface_score(self._governance.get(), MultiSigWalletInterface)
+        version = mig_score.getOwnerVersion()
+        self.require(version > 0 and version >= self._validator_version.get(), "Error: Invalid validator version")
+
+        wallet_owner_list = mig_score.getWalletOwners(0, mig_score.getWalletOwnerCount())
+        self._setValidators(version, [Address.from_string(wallet_owner) for wallet_owner in wallet_owner_list], mig_score.getRequirement())
 
     @only_governance
     @external
     def setFeeGovernance(self, _fee_governance: Address):
         self._fee_governance.set(_fee_governance)
 
+    @only_governance
+    @external
+    def migrateChainConfigs(self, _chains: str):
+        # _chains: comma separated chain symbols. e.g. "ETH,BSC"
+        # packs the legacy per-field configuration of each chain into its ChainConfig record
+        for chainSymbol in _chains.replace(" ", "").split(","):
+            self.require(len(chainSymbol) != 0 and self._chain.get() != chainSymbol, "Error: invalid chain")
+            self._migrateChainConfig(self.getChainId(chainSymbol))
+
     @only_governance
     @external
     def setValidChain(self, chainSymbol: str, valid: bool, fromAddrLen: int, uintsLen: int):
         self.require(self._chain.get() != chainSymbol, "Error: invalid chain")
-        self._is_valid_chain[self.getChainId(chainSymbol)] = valid
+        chainId = self.getChainId(chainSymbol)
+        config = self._getChainConfig(chainId)
+        config.is_valid = valid
         if valid :
-            self._chain_uints_length[self.getChainId(chainSymbol)] = uintsLen
-            self._chain_address_length[self.getChainId(chainSymbol)] = fromAddrLen
+            config.uints_length = uintsLen
+            config.address_length = fromAddrLen
         else:
-            self._chain_uints_length[self.getChainId(chainSymbol)] = 0
-            self._chain_address_length[self.getChainId(chainSymbol)] = 0
+            config.uints_length = 0
+            config.address_length = 0
+        self._chain_configs[chainId] = config.to_bytes()
 
     @only_governance
     @external
     def setChainLength(self, chainSymbol: str, fromAddrLen: int, uintsLen: int):
         self.require(self._chain.get() != chainSymbol, "Error: invalid chain")
-        self.require(self._is_valid_chain[self.getChainId(chainSymbol)], "Error: invalid chain")
-        self._chain_uints_length[self.getChainId(chainSymbol)] = uintsLen
-        self._chain_address_length[self.getChainId(chainSymbol)] = fromAddrLen
+        chainId = self.getChainId(chainSymbol)
+        config = self._getChainConfig(chainId)
+        self.require(config.is_valid, "Error: invalid chain")
+        config.uints_length = uintsLen
+        config.address_length = fromAddrLen
+        self._chain_configs[chainId] = config.to_bytes()
+
+    @only_governance
+    @external
+    def setWithdrawContext(self, hubContract: bytes, fromChain: str, valid: bool):
+        self.require(len(hubContract) == 20, "Error: Invaild HubContract")
+        key = hubContract + fromChain.encode()
+        if valid:
+            prefix = hubContract + fromChain.encode() + self._chain.get().encode()
+            self._withdraw_contexts[key] = self.getGovId(hubContract) + prefix
+        else:
+            self._withdraw_contexts.remove(key)
+
+    @only_governance
+    @external
+    def enableDepositIdReplay(self, fromChain: str):
+        """NOTE
+        from now on withdrawals from fromChain are recorded by the depositId in uints[64:96] instead of the hash.
+        it can not be disabled, since the ids recorded in the bitmap are not in the hash set.
+        deposit ids of the source contracts for fromChain must be unique.
+        """
+        self.require(self._chain.get() != fromChain, "Error: invalid chain")
+        self._deposit_id_replay[fromChain] = True
+
+    @only_governance
+    @external
+    def setMaxSignatures(self, _max_signatures: int):
+        self.require(_max_signatures >= 0, "Error: Invalid max signatures")
+        self._max_signatures.set(_max_signatures)
+
+    @only_governance
+    @external
+    def setFeeCreditToken(self, token: Address, valid: bool):
+        self.require(token != ICX_ADDR and token.is_contract, "Error: Invalid token address")
+        self._fee_credit_tokens[token] = valid
+
+    @only_governance
+    @external
+    def setTokenDecimal(self, tokenAddress: Address, decimal: int):
+        self.require(decimal >= 0, "Error: Invalid decimal")
+        self._token_decimals[tokenAddress] = decimal
 
     @only_governance
     @external
@@ -263,6 +536,15 @@ class IconVaultContract(IconScoreBase):
         self.require(_tax_rate < 10000, "Invalid Tax Rate")
         self._tax_rate.set(_tax_rate)
 
+    @only_governance
+    @external
+    def setTaxSettleThreshold(self, token: Address, threshold: int):
+        """NOTE
+        tax of token is settled once its accrued amount reaches threshold, 0 settles on every deposit
+        """
+        self.require(threshold >= 0, "Error: Invalid threshold")
+        self._tax_settle_thresholds[token] = threshold
+
     @only_governance
     @external
     def setTaxReceiver(self, _tax_receiver: bytes):
@@ -274,14 +556,7 @@ class IconVaultContract(IconScoreBase):
     def addFarm(self, token: Address, proxy: Address):
         self.require(self._farms[token] == None or self._farms[token] == EOA_ZERO, "Error: Remove Current Farm First")
 
-        if token == ICX_ADDR:
-            amount = self.icx.get_balance(self.address)
-        else:
-            amount = self.getTokenBalance(token, self.address)
-
-        if amount != 0 :
-            self.require(self._transferToken(token, proxy, amount), "Error: TransferToken Fail")
-            self.require(self._farmDeposit(proxy, amount), "Error: Farm Deposit Fail")
+        self._fillFarm(token, proxy)
 
         self._farms[token] = proxy
 
@@ -294,16 +569,22 @@ class IconVaultContract(IconScoreBase):
 
         if newProxy != None:
             self._farms[token] = newProxy
-            if token == ICX_ADDR:
-                amount = self.icx.get_balance(self.address)
-            else:
-                amount = self.getTokenBalance(token, self.address)
-
-            if amount != 0:
-                self.require(self._transferToken(token, newProxy, amount), "Error: TransferToken Fail")
-                self.require(self._farmDeposit(newProxy, amount), "Error: Farm Deposit Fail")
+            self._fillFarm(token, newProxy)
         else:
             self._farms[token] = EOA_ZERO
+            self._hot_reserves[token] = 0
+
+    @only_governance
+    @external
+    def setReserveWatermarks(self, token: Address, low: int, high: int):
+        """NOTE
+        while a farm is set for token, deposits and withdrawals are served from the hot reserve in the vault.
+        the reserve is brought back to (low + high) // 2 when it goes above high or below low.
+        high == 0 sends every deposit to the farm
+        """
+        self.require(0 <= low <= high, "Error: Invalid watermarks")
+        self._reserve_low_watermarks[token] = low
+        self._reserve_high_watermarks[token] = high
 
     @only_governance
     @external
@@ -318,91 +599,220 @@ class IconVaultContract(IconScoreBase):
     @external
     def setChainFee(self, chainSymbol: str, fee: int, feeWithData: int):
         self.require(self.msg.sender == self._policy_admin.get(), "Error: Invalid Sender")
-        self.require(self._is_valid_chain[self.getChainId(chainSymbol)], "Error: Invalid Chain")
-        self._chain_fee[self.getChainId(chainSymbol)] = fee
-        self._chain_fee_with_data[self.getChainId(chainSymbol)] = feeWithData
+        chainId = self.getChainId(chainSymbol)
+        config = self._getChainConfig(chainId)
+        self.require(config.is_valid, "Error: Invalid Chain")
+        config.fee = fee
+        config.fee_with_data = feeWithData
+        self._chain_configs[chainId] = config.to_bytes()
+
+    @only_activated
+    @external
+    def settleTax(self, token: Address):
+        self.require(self._accrued_taxes[token] > 0, "Error: No accrued tax")
+        self.require(len(self._tax_receiver.get()) != 0, "Error: Invalid taxReceiver")
+
+        decimal = 18 if token == ICX_ADDR else self._getTokenDecimal(token)
+        self._settleTax(self.address, token, decimal)
+
+    @external
+    def sweepFees(self):
+        # accrued fees always go to the fee governance, so anyone may trigger the sweep
+        amount = self._accrued_fees.get()
+        self.require(amount > 0, "Error: No accrued fees")
+        self._accrued_fees.set(0)
+        self.require(self._transferBridgingFee(amount), "Error: Transfer Bridging Fee Fail")
+        self.FeesSwept(self._fee_governance.get(), amount)
+
+    @payable
+    def fallback(self):
+        # only ICX returned from the ICX farm is accepted, deposits go through deposit
+        farm = self._farms[ICX_ADDR]
+        self.require(farm != None and farm != EOA_ZERO and self.msg.sender == farm, "Error: Invalid ICX sender")
+
+    @payable
+    @external
+    def depositFeeCredit(self):
+        self.require(self.msg.value > 0, "Error: Not enough amount")
+        self._fee_credits[self.msg.sender] = SafeMath.add(self._fee_credits[self.msg.sender], self.msg.value)
+        self._total_fee_credit.set(SafeMath.add(self._total_fee_credit.get(), self.msg.value))
+
+    @external
+    def withdrawFeeCredit(self, amount: int):
+        self.require(amount > 0, "Error: Not enough amount")
+        self._spendFeeCredit(self.msg.sender, amount)
+        self.require(self._transferToken(ICX_ADDR, self.msg.sender, amount), "Error: Withdraw fail")
 
     @payable
     @external
     def deposit(self, toChain: str, toAddr: bytes, data: bytes = None):
-        fee = 0
-        if data == None:
-            fee = self._chain_fee[self.getChainId(toChain)]
-        else:
+        config = self._getChainConfig(self.getChainId(toChain))
+        if data != None:
             self.require(len(data) != 0, "Error: invalid data")
-            fee = self._chain_fee_with_data[self.getChainId(toChain)]
+        fee = config.bridging_fee(data)
         self.require(self.msg.value > fee, "Error: Not enough bridging fee")
         if fee != 0 :
-            self.require(self._transferBridgingFee(fee), "Error: Transfer Bridging Fee Fail")
-        self._depositToken(ICX_ADDR, toChain, toAddr, SafeMath.sub(self.msg.value, fee), data)
+            self._accrueBridgingFee(toChain, data, fee)
+        self._depositToken(ICX_ADDR, toChain, config, toAddr, SafeMath.sub(self.msg.value, fee), data)
 
     @payable
     @external
     def depositToken(self, token: Address, toChain:str, toAddr: bytes, amount: int, data: bytes = None):
         self.require(token != ICX_ADDR, "Error: Invalid token address")
 
-        fee = 0
-        if data == None:
-            fee = self._chain_fee[self.getChainId(toChain)]
-        else:
+        config = self._getChainConfig(self.getChainId(toChain))
+        if data != None:
             self.require(len(data) != 0, "Error: invalid data")
-            fee = self._chain_fee_with_data[self.getChainId(toChain)]
+        fee = config.bridging_fee(data)
         self.require(self.msg.value >= fee, "Error: Not enough bridging fee")
         if fee != 0 :
-            self.require(self._transferBridgingFee(self.msg.value), "Error: Transfer Bridging Fee Fail")
-        self._depositToken(token, toChain, toAddr, amount, data)
+            self._accrueBridgingFee(toChain, data, self.msg.value)
+        self._depositToken(token, toChain, config, toAddr, amount, data)
+
+    @only_activated
+    @payable
+    @external
+    def depositBatch(self, deposits: str):
+        """NOTE
+        deposits is a json list of deposit params, bytes values are hex strings and ICX is the token cx000..0
+        [{"token": "cx..", "toChain": "ETH", "toAddr": "0x..", "amount": "0x..", "data": "0x.."}, ...]
+        msg.value must be the bridging fees of all items plus the amounts of ICX items.
+        each token is taken with a single transferFrom, items get contiguous depositIds in the list order
+        """
+        try:
+            deposit_list = json_loads(deposits)
+        except:
+            revert("Error: Invalid deposits")
+        self.require(isinstance(deposit_list, list), "Error: Invalid deposits")
+        self.require(0 < len(deposit_list) <= MAX_DEPOSIT_BATCH, "Error: Invalid deposits count")
+
+        configs = {}
+        totals = {}
+        fees = {}
+        items = []
+        fee_total = 0
+
+        for item in deposit_list:
+            try:
+                token = params_type_converter("Address", item["token"])
+                toChain = params_type_converter("str", item["toChain"])
+                toAddr = params_type_converter("bytes", item["toAddr"])
+                amount = params_type_converter("int", item["amount"])
+                data = item.get("data")
+                if data != None:
+                    data = params_type_converter("bytes", data)
+            except:
+                revert("Error: Invalid deposits")
+
+            config = configs.get(toChain)
+            if config is None:
+                config = self._getChainConfig(self.getChainId(toChain))
+                configs[toChain] = config
+
+            self.require(config.is_valid, "Error: Invalid toChain")
+            self.require(token != EOA_ZERO and token.is_contract, "Error: Invalid token address")
+            self.require(amount > 0, "Error: Not enough amount")
+            if data != None:
+                self.require(len(data) != 0, "Error: invalid data")
+
+            fee = config.bridging_fee(data)
+            feeKey = (toChain, data == None)
+            fees[feeKey] = SafeMath.add(fees.get(feeKey, 0), fee)
+            fee_total = SafeMath.add(fee_total, fee)
+
+            totals[token] = SafeMath.add(totals.get(token, 0), amount)
+            items.append((token, toChain, toAddr, amount, data))
+
+        self.require(self.msg.value == SafeMath.add(fee_total, totals.get(ICX_ADDR, 0)), "Error: Invalid bridging fee")
+        self._accrueBridgingFees(fees, fee_total)
+
+        sender = self.msg.sender
+        for token, total in totals.items():
+            if token != ICX_ADDR:
+                self.require(self._transferFromToken(token, sender, self.address, total), "Error: TransferFrom fail")
+
+            farm = self._farms[token]
+            if farm != None and farm != EOA_ZERO:
+                self._depositToReserve(token, farm, total)
+
+        # reserve the id range first, tax settlements below take ids after it
+        firstDepositId = self._deposit_count.get() + 1
+        self._deposit_count.set(firstDepositId + len(items) - 1)
+
+        taxed = self._tax_rate.get() != 0 and len(self._tax_receiver.get()) != 0
+        chain = self._chain.get()
+        senderBytes = self.convertAddressToBytes(sender)
+
+        # (decimal, token bytes) of each token
+        tokenInfos = {}
+        for token in totals:
+            decimal = 18 if token == ICX_ADDR else self._getTokenDecimal(token)
+            self.require(decimal > 0, "Error: Invalid decimal")
+            tokenInfos[token] = (decimal, self.convertAddressToBytes(token))
+
+        for i, (token, toChain, toAddr, amount, data) in enumerate(items):
+            decimal, tokenBytes = tokenInfos[token]
+
+            if taxed:
+                tax = self._payTax(sender, token, amount, decimal)
+                amount = SafeMath.sub(amount, tax)
+
+            self.Deposit(chain, toChain, senderBytes, toAddr, tokenBytes, decimal, amount, firstDepositId + i, data)
 
     @only_activated
-    def _depositToken(self, token: Address, toChain: str, toAddr: bytes, amount: int, data: bytes):
-        self.require(self._is_valid_chain[self.getChainId(toChain)], "Error: Invalid toChain")
+    def _depositToken(self, token: Address, toChain: str, toChainConfig: ChainConfig, toAddr: bytes, amount: int, data: bytes, sender: Address = None):
+        self.require(toChainConfig.is_valid, "Error: Invalid toChain")
         self.require(amount > 0, "Error: Not enough amount")
 
+        # sender is given when the tokens are already received through tokenFallback
+        received = sender != None
+        if not received:
+            sender = self.msg.sender
+
         if token == ICX_ADDR:
             decimal = 18
         else:
-            decimal = self.getTokenDecimal(token)
-            """NOTE
-            https://github.com/icon-project/IIPs/blob/master/IIPS/iip-2.md
-            IRC2 do not guarantee transferFrom method
-            """
-            self.require(self._transferFromToken(token, self.msg.sender, self.address, amount), "Error: TransferFrom fail")
+            decimal = self._getTokenDecimal(token)
+            if not received:
+                """NOTE
+                https://github.com/icon-project/IIPs/blob/master/IIPS/iip-2.md
+                IRC2 do not guarantee transferFrom method
+                """
+                self.require(self._transferFromToken(token, sender, self.address, amount), "Error: TransferFrom fail")
 
         self.require(decimal > 0, "Error: Invalid decimal")
 
         farm = self._farms[token]
         if farm != None and farm != EOA_ZERO:
-            self.require(self._transferToken(token, farm, amount), "Error: TransferToken Fail")
-            self.require(self._farmDeposit(farm, amount), "Error: Farm Deposit Fail")
+            self._depositToReserve(token, farm, amount)
 
         if self._tax_rate.get() != 0 and len(self._tax_receiver.get()) != 0:
-            tax = self._payTax(token, amount, decimal)
+            tax = self._payTax(sender, token, amount, decimal)
             amount = SafeMath.sub(amount, tax)
 
         depositId = self._deposit_count.get() + 1
         self._deposit_count.set(depositId)
 
-        self.Deposit(self._chain.get(), toChain, self.convertAddressToBytes(self.msg.sender), toAddr, self.convertAddressToBytes(token), decimal, amount, depositId, data)
+        self.Deposit(self._chain.get(), toChain, self.convertAddressToBytes(sender), toAddr, self.convertAddressToBytes(token), decimal, amount, depositId, data)
 
     @only_activated
     @payable
     @external
     def depositNFT(self, token: Address, toChain: str, toAddr: bytes, tokenId: int, data: bytes = None):
-        self.require(self._is_valid_chain[self.getChainId(toChain)], "Error: Invalid toChain")
+        config = self._getChainConfig(self.getChainId(toChain))
+        self.require(config.is_valid, "Error: Invalid toChain")
         self.require(token != ICX_ADDR and token != EOA_ZERO, "Error: Invalid Token Address")
-        self.require(self.getNFTOwner(token, tokenId) != self.msg.sender, "Error: Owner check fail")
+        self.require(self._nft_custody_index[token][tokenId] == 0, "Error: Already in custody")
 
-        fee = 0
-        if data == None:
-            fee = self._chain_fee[self.getChainId(toChain)]
-        else:
+        if data != None:
             self.require(len(data) != 0, "Error: invalid data")
-            fee = self._chain_fee_with_data[self.getChainId(toChain)]
+        fee = config.bridging_fee(data)
         self.require(self.msg.value >= fee, "Error: Not enough bridging fee")
         if fee != 0 :
-            self.require(self._transferBridgingFee(self.msg.value), "Error: Transfer Bridging Fee Fail")
+            self._accrueBridgingFee(toChain, data, self.msg.value)
 
         self.require(self._transferFromNFT(token, self.msg.sender, self.address, tokenId), "Error: deposit fail")
-        self.require(self.getNFTOwner(token, tokenId) == self.address, "Error: Owner check fail")
+        self._addNFTCustody(token, tokenId)
 
         depositId = self._deposit_count.get() + 1
         self._deposit_count.set(depositId)
@@ -412,28 +822,124 @@ class IconVaultContract(IconScoreBase):
     @only_activated
     @external
     def withdraw(self, hubContract: bytes, fromChain: str, fromAddr: bytes, toAddr: bytes, token: bytes, bytes32s: bytes, uints: bytes, sigs: str, data: bytes = None):
+        self._withdraw(hubContract, fromChain, fromAddr, toAddr, token, bytes32s, uints, self._splitSignatures(sigs), data)
+
+    @only_activated
+    @external
+    def withdrawPacked(self, payload: bytes):
+        """NOTE
+        payload packs the withdraw params as [length(2)][value] fields in the order of
+        hubContract, fromChain, fromAddr, toAddr, token, bytes32s, uints, data, sigs
+        an empty data field means no data, sigs is the concatenation of 65 bytes signatures
+        """
+        try:
+            fields = unpack_fields(payload, PACKED_WITHDRAW_FIELD_COUNT)
+            sig_list = split_signatures(fields[8])
+            fromChain = str(fields[1], "utf-8")
+        except:
+            revert("Error: Invalid payload")
+
+        data = bytes(fields[7]) if len(fields[7]) > 0 else None
+        self._withdraw(bytes(fields[0]), fromChain, bytes(fields[2]), bytes(fields[3]), bytes(fields[4]), bytes(fields[5]), bytes(fields[6]), sig_list, data)
+
+    @only_activated
+    @external
+    def withdrawBatch(self, withdrawals: str):
+        """NOTE
+        withdrawals is a json list of withdraw params, bytes values are hex strings
+        [{"hubContract": "0x..", "fromChain": "ETH", "fromAddr": "0x..", "toAddr": "0x..", "token": "0x..",
+          "bytes32s": "0x..", "uints": "0x..", "sigs": "0x..,0x..", "data": "0x.."}, ...]
+        """
+        try:
+            withdraw_list = json_loads(withdrawals)
+        except:
+            revert("Error: Invalid withdrawals")
+        self.require(isinstance(withdraw_list, list), "Error: Invalid withdrawals")
+        self.require(0 < len(withdraw_list) <= MAX_WITHDRAW_BATCH, "Error: Invalid withdrawals count")
+
+        cache = {"owners": {}, "contexts": {}, "chains": {}}
+
+        for item in withdraw_list:
+            try:
+                hubContract = params_type_converter("bytes", item["hubContract"])
+                fromChain = params_type_converter("str", item["fromChain"])
+                fromAddr = params_type_converter("bytes", item["fromAddr"])
+                toAddr = params_type_converter("bytes", item["toAddr"])
+                token = params_type_converter("bytes", item["token"])
+                bytes32s = params_type_converter("bytes", item["bytes32s"])
+                uints = params_type_converter("bytes", item["uints"])
+                sigs = self._splitSignatures(params_type_converter("str", item["sigs"]))
+                data = item.get("data")
+                if data != None:
+                    data = params_type_converter("bytes", data)
+            except:
+                revert("Error: Invalid withdrawals")
+
+            self._withdraw(hubContract, fromChain, fromAddr, toAddr, token, bytes32s, uints, sigs, data, cache)
+
+    @only_activated
+    @external
+    def submitWithdrawRoot(self, root: bytes, sigs: str):
+        """NOTE
+        root is the merkle root of withdraw hashes built as in withdraw, see utils.merkle
+        validators sign sha_256("ROOT" + chain + vault address + root)
+        """
+        self.require(len(root) == 32, "Error: Invalid root length")
+        self.require(not self._verified_roots[root], "Error: Already verified root")
+
+        rootHash = sha_256("ROOT".encode() + self._chain.get().encode() + self.convertAddressToBytes(self.address) + root)
+        self.require(self._validate_signature(rootHash, self._splitSignatures(sigs)), "Error: Invalid Signature")
+
+        self._verified_roots[root] = True
+        self.WithdrawRootSubmitted(root)
+
+    @only_activated
+    @external
+    def withdrawWithProof(self, hubContract: bytes, fromChain: str, fromAddr: bytes, toAddr: bytes, token: bytes, bytes32s: bytes, uints: bytes, root: bytes, proof: bytes, data: bytes = None):
+        """NOTE
+        proof is the concatenation of the 32 bytes sibling hashes from the withdraw hash up to the verified root
+        """
+        self._withdraw(hubContract, fromChain, fromAddr, toAddr, token, bytes32s, uints, None, data, None, root, proof)
+
+    def _withdraw(self, hubContract: bytes, fromChain: str, fromAddr: bytes, toAddr: bytes, token: bytes, bytes32s: bytes, uints: bytes, sigs: list, data: bytes = None, cache: dict = None, root: bytes = None, proof: bytes = None):
+        if cache is None:
+            cache = {"owners": {}, "contexts": {}, "chains": {}}
+
+        config = cache["chains"].get(fromChain)
+        if config is None:
+            config = self._getChainConfig(self.getChainId(fromChain))
+            cache["chains"][fromChain] = config
+
         self.require(len(hubContract) == 20, "Error: Invaild HubContract")
-        self.require(len(fromAddr) == self._chain_address_length[self.getChainId(fromChain)], "Error: Invalid fromAddr length")
+        self.require(len(fromAddr) == config.address_length, "Error: Invalid fromAddr length")
         self.require(len(toAddr) == 21, "Error: Invalid toAddr length")
         self.require(len(token) == 21, "Error: Invalid token length")
         self.require(len(bytes32s) == 64, "Error: Invalid bytes32s length")
         self.require(len(bytes32s) % 32 == 0, "Error: Invalid bytes32s length")
-        self.require(len(uints) == self._chain_uints_length[self.getChainId(fromChain)], "Error: Invalid uints length")
+        self.require(len(uints) == config.uints_length, "Error: Invalid uints length")
         self.require(len(uints) % 32 == 0, "Error: Invalid bytes32s length")
-        self.require(self._is_valid_chain[self.getChainId(fromChain)], "Error: Invalid fromChain")
+        self.require(config.is_valid, "Error: Invalid fromChain")
 
-        govId = bytes32s[:32]
-        self.require(govId == self.getGovId(hubContract), "Error: Invalid govId")
+        context = cache["contexts"].get((hubContract, fromChain))
+        if context is None:
+            context = self._getWithdrawContext(hubContract, fromChain)
+            cache["contexts"][(hubContract, fromChain)] = context
+        govId, prefix = context
+        self.require(bytes32s[:32] == govId, "Error: Invalid govId")
 
-        hash_bytes = hubContract + fromChain.encode() + self._chain.get().encode() + fromAddr + toAddr + token + bytes32s + uints
+        hash_bytes = prefix + fromAddr + toAddr + token + bytes32s + uints
         if data != None:
             hash_bytes += data
 
         whash = sha_256(hash_bytes)
         self.require(not self._is_used_hash[whash], "Error: used withdrawHash")
-        self._is_used_hash[whash] = True
+        self._markProcessed(fromChain, whash, uints)
 
-        self.require(self._validate_signature(whash, sigs), "Error: Invalid Signature")
+        if root is None:
+            self.require(self._validate_signature(whash, sigs, cache["owners"]), "Error: Invalid Signature")
+        else:
+            self.require(self._verified_roots[root], "Error: Unverified root")
+            self.require(verify_merkle_proof(whash, root, proof), "Error: Invalid proof")
 
         tokenAddress = self.convertBytesToAddress(token)
         amount = int.from_bytes(uints[:32], "big")
@@ -441,7 +947,7 @@ class IconVaultContract(IconScoreBase):
 
         farm = self._farms[tokenAddress]
         if farm != None and farm != EOA_ZERO:
-            self.require(self._farmWithdraw(farm, to, amount), "Error: Farm Withdraw Fail")
+            self._withdrawFromReserve(tokenAddress, farm, to, amount)
         else:
             self.require(self._transferToken(tokenAddress, to, amount), "Error: Withdraw fail")
 
@@ -454,34 +960,37 @@ class IconVaultContract(IconScoreBase):
     @only_activated
     @external
     def withdrawNFT(self, hubContract: bytes, fromChain: str, fromAddr: bytes, toAddr: bytes, token: bytes, bytes32s: bytes, uints: bytes, sigs: str, data: bytes = None):
+        config = self._getChainConfig(self.getChainId(fromChain))
         self.require(len(hubContract) == 20, "Error: Invaild HubContract")
-        self.require(len(fromAddr) == self._chain_address_length[self.getChainId(fromChain)], "Error: Invalid fromAddr length")
+        self.require(len(fromAddr) == config.address_length, "Error: Invalid fromAddr length")
         self.require(len(toAddr) == 21, "Error: Invalid toAddr length")
         self.require(len(token) == 21, "Error: Invalid token length")
         self.require(len(bytes32s) == 64, "Error: Invalid bytes32s length")
         self.require(len(bytes32s) % 32 == 0, "Error: Invalid bytes32s length")
-        self.require(len(uints) == self._chain_uints_length[self.getChainId(fromChain)], "Error: Invalid uints length")
+        self.require(len(uints) == config.uints_length, "Error: Invalid uints length")
         self.require(len(uints) % 32 == 0, "Error: Invalid bytes32s length")
-        self.require(self._is_valid_chain[self.getChainId(fromChain)], "Error: Invalid fromChain")
+        self.require(config.is_valid, "Error: Invalid fromChain")
 
-        govId = bytes32s[:32]
-        self.require(govId == self.getGovId(hubContract), "Error: Invalid govId")
+        govId, prefix = self._getWithdrawContext(hubContract, fromChain)
+        self.require(bytes32s[:32] == govId, "Error: Invalid govId")
 
-        hash_bytes = "NFT".encode() + hubContract + fromChain.encode() + self._chain.get().encode() + fromAddr + toAddr + token + bytes32s + uints
+        hash_bytes = "NFT".encode() + prefix + fromAddr + toAddr + token + bytes32s + uints
         if data != None:
             hash_bytes += data
 
         whash = sha_256(hash_bytes)
         self.require(not self._is_used_hash[whash], "Error: used withdrawHash")
-        self._is_used_hash[whash] = True
+        self._markProcessed(fromChain, whash, uints)
 
-        self.require(self._validate_signature(whash, sigs), "Error: Invalid Signature")
+        self.require(self._validate_signature(whash, self._splitSignatures(sigs)), "Error: Invalid Signature")
 
         tokenAddress = self.convertBytesToAddress(token)
         tokenId = int.from_bytes(uints[32:64], "big")
         to = self.convertBytesToAddress(toAddr)
 
-        self.require(self.getNFTOwner(tokenAddress, tokenId) == self.address, "Error: Owner check fail")
+        # NFTs deposited before the custody ledger are checked with the collection
+        if not self._removeNFTCustody(tokenAddress, tokenId):
+            self.require(self.getNFTOwner(tokenAddress, tokenId) == self.address, "Error: Owner check fail")
         self.require(self._transferNFT(tokenAddress, to, tokenId), "Error: Withdraw fail")
 
         if to.is_contract and data != None:
@@ -492,33 +1001,192 @@ class IconVaultContract(IconScoreBase):
 
     @external
     def tokenFallback(self, _from: Address, _value: int, _data: bytes):
-        pass
+        """NOTE
+        _data with a deposit instruction deposits the received tokens in the same transaction.
+        the bridging fee is paid from the fee credit of _from(see depositFeeCredit),
+        which is only allowed for tokens registered by setFeeCreditToken since _from is reported by the token
+        {"method": "deposit", "params": {"toChain": "ETH", "toAddr": "0x..", "data": "0x.."}}
+        other transfers(e.g. tokens returned from a farm) are just received, malformed json _data reverts
+        """
+        instruction = self._parseTokenFallbackData(_data)
+        if instruction == None or instruction.get("method") != "deposit":
+            return
+
+        token = self.msg.sender
+        self.require(token != ICX_ADDR, "Error: Invalid token address")
 
-    def _validate_signature(self, sigHash: bytes, sigs: str) -> bool:
-        mig_score = self.create_interface_score(self._governance.get(), MultiSigWalletInterface)
-        mig_required = mig_score.getRequirement()
+        try:
+            params = instruction["params"]
+            toChain = params_type_converter("str", params["toChain"])
+            toAddr = params_type_converter("bytes", params["toAddr"])
+            data = params.get("data")
+            if data != None:
+                data = params_type_converter("bytes", data)
+        except:
+            revert("Error: Invalid deposit instruction")
+
+        config = self._getChainConfig(self.getChainId(toChain))
+        if data != None:
+            self.require(len(data) != 0, "Error: invalid data")
+        fee = config.bridging_fee(data)
+        if fee != 0 :
+            self.require(self._fee_credit_tokens[token], "Error: Fee credit not allowed for token")
+            self._spendFeeCredit(_from, fee)
+            self._accrueBridgingFee(toChain, data, fee)
+        self._depositToken(token, toChain, config, toAddr, _value, data, _from)
+
+    def _parseTokenFallbackData(self, _data: bytes) -> dict:
+        if _data == None or len(_data) == 0 or _data[0] != b'{'[0]:
+            return None
+        # _data that looks like json is an instruction, keeping the tokens without a deposit would lose them
+        try:
+            instruction = json_loads(_data.decode())
+        except:
+            revert("Error: Invalid deposit instruction")
+        self.require(isinstance(instruction, dict), "Error: Invalid deposit instruction")
+        return instruction
+
+    def _getFarmableIcx(self) -> int:
+        # prepaid fee credits and accrued bridging fees are not bridged liquidity
+        reserved = SafeMath.add(self._total_fee_credit.get(), self._accrued_fees.get())
+        return SafeMath.sub(self.icx.get_balance(self.address), reserved)
+
+    def _spendFeeCredit(self, account: Address, amount: int):
+        credit = self._fee_credits[account]
+        self.require(credit >= amount, "Error: Not enough fee credit")
+        self._fee_credits[account] = credit - amount
+        self._total_fee_credit.set(SafeMath.sub(self._total_fee_credit.get(), amount))
+
+    def _getWithdrawContext(self, hubContract: bytes, fromChain: str) -> tuple:
+        # returns (govId, withdraw hash prefix), registered by setWithdrawContext or built on the fly
+        context = self._withdraw_contexts[hubContract + fromChain.encode()]
+        if context != None:
+            return context[:32], context[32:]
+
+        return self.getGovId(hubContract), hubContract + fromChain.encode() + self._chain.get().encode()
+
+    def _markProcessed(self, fromChain: str, whash: bytes, uints: bytes):
+        if not self._deposit_id_replay[fromChain]:
+            self._is_used_hash[whash] = True
+            return
+
+        self.require(len(uints) >= 96, "Error: Invalid uints length")
+        depositId = int.from_bytes(uints[64:96], "big")
+        word_index = depositId >> 8
+        bit = 1 << (depositId & 0xff)
+
+        word = self._processed_deposits[fromChain][word_index]
+        self.require(word & bit == 0, "Error: used depositId")
+        self._processed_deposits[fromChain][word_index] = word | bit
+
+    def _getTokenDecimal(self, tokenAddress: Address) -> int:
+        decimal = self._token_decimals[tokenAddress]
+        if decimal == 0:
+            decimal = self.getTokenDecimal(tokenAddress)
+            self._token_decimals[tokenAddress] = decimal
+        return decimal
+
+    def _migrateChainConfig(self, chainId: bytes):
+        if self._chain_configs[chainId] != None:
+            return
+
+        self._chain_configs[chainId] = self._getChainConfig(chainId).to_bytes()
+        del self._is_valid_chain[chainId]
+        del self._chain_address_length[chainId]
+        del self._chain_uints_length[chainId]
+        del self._chain_fee[chainId]
+        del self._chain_fee_with_data[chainId]
+
+    def _getChainConfig(self, chainId: bytes) -> ChainConfig:
+        packed_config = self._chain_configs[chainId]
+        if packed_config != None:
+            return ChainConfig.from_bytes(packed_config)
+
+        # not migrated yet, read it from the legacy per-field storage
+        return ChainConfig(self._is_valid_chain[chainId], self._chain_address_length[chainId], self._chain_uints_length[chainId], self._chain_fee[chainId], self._chain_fee_with_data[chainId])
+
+    def _setValidators(self, version: int, wallet_owners: list, required: int):
+        self.require(0 < required <= len(wallet_owners), "Error: Invalid validator requirement")
+
+        self._clearValidators()
+        for wallet_owner in wallet_owners:
+            self.require(not self._is_validator[wallet_owner], "Error: Duplicate validator")
+            self._validators.put(wallet_owner)
+            self._is_validator[wallet_owner] = True
+
+        self._validator_required.set(required)
+        self._validator_version.set(version)
+
+    def _clearValidators(self):
+        while len(self._validators) > 0:
+            del self._is_validator[self._validators.pop()]
+
+    def _splitSignatures(self, sigs: str) -> list:
+        return [params_type_converter("bytes", sig) for sig in sigs.replace(" ", "").split(",")]
+
+    def _validate_signature(self, sigHash: bytes, sigs: list, owners: dict = None) -> bool:
+        max_signatures = self._max_signatures.get()
+        self.require(max_signatures == 0 or len(sigs) <= max_signatures, "Error: Too many signatures")
+
+        # until the local copy of wallet owners is synced, the governance wallet verifies in a single call
+        if self._validator_version.get() == 0:
+            mig_score = self.create_interface_score(self._governance.get(), MultiSigWalletInterface)
+            return mig_score.verifySignatures(sigHash, ",".join(["0x" + sig.hex() for sig in sigs]))
+
+        mig_required = self._validator_required.get()
         self.require(mig_required > 0, "Invalid MultiSigWallet Required")
 
-        sig_list = sigs.replace(" ", "").split(",")
+        # owners caches validator lookups across the signatures of a batch
+        if owners is None:
+            owners = {}
+
         major_count = 0
+        remaining = len(sigs)
+
+        va_set = set()
 
-        va_list = []
+        for sig in sigs:
+            # stop once the requirement is met, fail once the rest of sigs can not meet it
+            if major_count >= mig_required:
+                break
+            if major_count + remaining < mig_required:
+                return False
+            remaining -= 1
 
-        for sig_bytes in sig_list:
-            sig = params_type_converter("bytes", sig_bytes)
             self.require(len(sig) == 65, "Invalid Sig length")
 
             pub = recover_key(sigHash, sig, False)
             self.require(len(pub) == 65, "Invalid PubKey length")
 
             va = Address.from_bytes(sha3_256(pub[1:])[12:])
-            if mig_score.checkIfWalletOwner(va):
-                self.require(not va in va_list, "Duplicate signature")
+            if va not in owners:
+                owners[va] = self._is_validator[va]
+            if owners[va]:
+                self.require(va not in va_set, "Duplicate signature")
                 major_count = major_count + 1
-                va_list.append(va)
+                va_set.add(va)
 
         return mig_required <= major_count
 
+    def _accrueBridgingFee(self, toChain: str, data: bytes, amount: int):
+        if amount == 0:
+            return
+
+        feeType = FEE_TYPE if data == None else FEE_WITH_DATA_TYPE
+        self._fee_revenues[toChain][feeType] = SafeMath.add(self._fee_revenues[toChain][feeType], amount)
+        self._accrued_fees.set(SafeMath.add(self._accrued_fees.get(), amount))
+
+    def _accrueBridgingFees(self, fees: dict, total: int):
+        # fees: (toChain, without data) -> amount, accrued with a single _accrued_fees write
+        for (toChain, withoutData), amount in fees.items():
+            if amount == 0:
+                continue
+            feeType = FEE_TYPE if withoutData else FEE_WITH_DATA_TYPE
+            self._fee_revenues[toChain][feeType] = SafeMath.add(self._fee_revenues[toChain][feeType], amount)
+
+        if total != 0:
+            self._accrued_fees.set(SafeMath.add(self._accrued_fees.get(), total))
+
     def _transferBridgingFee(self, amount: int) -> bool:
         try:
             self.icx.transfer(self._fee_governance.get(), amount)
@@ -528,16 +1196,26 @@ class IconVaultContract(IconScoreBase):
 
         return execute_result
 
-    def _payTax(self, token: Address, amount: int, decimal: int, data: bytes = None) -> int:
+    def _payTax(self, sender: Address, token: Address, amount: int, decimal: int, data: bytes = None) -> int:
         tax = SafeMath.div(SafeMath.mul(amount, self._tax_rate.get()), 10000)
 
         if tax != 0:
-            depositId = self._deposit_count.get() + 1
-            self._deposit_count.set(depositId)
-            self.Deposit(self._chain.get(), "ORBIT", self.convertAddressToBytes(self.msg.sender), self._tax_receiver.get(), self.convertAddressToBytes(token), decimal, tax, depositId, data)
+            accrued = SafeMath.add(self._accrued_taxes[token], tax)
+            self._accrued_taxes[token] = accrued
+            if accrued >= self._tax_settle_thresholds[token]:
+                # a settlement of this deposit's tax alone keeps the depositor as fromAddr
+                self._settleTax(sender if accrued == tax else self.address, token, decimal, data)
 
         return tax
 
+    def _settleTax(self, sender: Address, token: Address, decimal: int, data: bytes = None):
+        tax = self._accrued_taxes[token]
+        self._accrued_taxes[token] = 0
+
+        depositId = self._deposit_count.get() + 1
+        self._deposit_count.set(depositId)
+        self.Deposit(self._chain.get(), "ORBIT", self.convertAddressToBytes(sender), self._tax_receiver.get(), self.convertAddressToBytes(token), decimal, tax, depositId, data)
+
     def _transferFromToken(self, tokenAddress: Address, _from: Address, _to: Address, amount: int) -> bool:
         try:
             token_score = self.create_interface_score(tokenAddress, TokenTransferInterface)
@@ -560,6 +1238,29 @@ class IconVaultContract(IconScoreBase):
 
         return execute_result
 
+    def _addNFTCustody(self, nftAddress: Address, tokenId: int):
+        count = self._nft_custody_count[nftAddress]
+        self._nft_custody_ids[nftAddress][count] = tokenId
+        self._nft_custody_index[nftAddress][tokenId] = count + 1
+        self._nft_custody_count[nftAddress] = count + 1
+
+    def _removeNFTCustody(self, nftAddress: Address, tokenId: int) -> bool:
+        index = self._nft_custody_index[nftAddress][tokenId]
+        if index == 0:
+            return False
+
+        # move the last token id into the removed slot
+        last = self._nft_custody_count[nftAddress] - 1
+        if index - 1 != last:
+            last_token_id = self._nft_custody_ids[nftAddress][last]
+            self._nft_custody_ids[nftAddress][index - 1] = last_token_id
+            self._nft_custody_index[nftAddress][last_token_id] = index
+
+        del self._nft_custody_ids[nftAddress][last]
+        del self._nft_custody_index[nftAddress][tokenId]
+        self._nft_custody_count[nftAddress] = last
+        return True
+
     def _transferFromNFT(self, nftAddress: Address, _from: Address, _to: Address, tokenId: int) -> bool:
         try:
             token_score = self.create_interface_score(nftAddress, NFTTransferInterface)
@@ -580,6 +1281,50 @@ class IconVaultContract(IconScoreBase):
 
         return execute_result
 
+    def _getReserveTarget(self, token: Address) -> int:
+        return (self._reserve_low_watermarks[token] + self._reserve_high_watermarks[token]) // 2
+
+    def _fillFarm(self, token: Address, proxy: Address):
+        if token == ICX_ADDR:
+            amount = self._getFarmableIcx()
+        else:
+            amount = self.getTokenBalance(token, self.address)
+
+        reserve = min(amount, self._getReserveTarget(token))
+        amount = amount - reserve
+        if amount != 0:
+            self.require(self._transferToken(token, proxy, amount), "Error: TransferToken Fail")
+            self.require(self._farmDeposit(proxy, amount), "Error: Farm Deposit Fail")
+
+        self._hot_reserves[token] = reserve
+
+    def _depositToReserve(self, token: Address, farm: Address, amount: int):
+        reserve = SafeMath.add(self._hot_reserves[token], amount)
+        if reserve > self._reserve_high_watermarks[token]:
+            target = self._getReserveTarget(token)
+            self.require(self._transferToken(token, farm, reserve - target), "Error: TransferToken Fail")
+            self.require(self._farmDeposit(farm, reserve - target), "Error: Farm Deposit Fail")
+            reserve = target
+
+        self._hot_reserves[token] = reserve
+
+    def _withdrawFromReserve(self, token: Address, farm: Address, to: Address, amount: int):
+        reserve = self._hot_reserves[token]
+        if reserve < amount:
+            self.require(self._farmWithdraw(farm, to, amount), "Error: Farm Withdraw Fail")
+            return
+
+        self.require(self._transferToken(token, to, amount), "Error: Withdraw fail")
+        reserve = reserve - amount
+
+        # refilling is best effort, the withdrawal is already served from the reserve
+        if reserve < self._reserve_low_watermarks[token]:
+            target = self._getReserveTarget(token)
+            if self._farmWithdraw(farm, self.address, target - reserve):
+                reserve = target
+
+        self._hot_reserves[token] = reserve
+
     def _farmDeposit(self, proxy: Address, amount: int) -> bool:
         try:
             farm_score = self.create_interface_score(proxy, FarmInterface)